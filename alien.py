@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 
@@ -12,28 +11,12 @@ class Alien(Sprite):
         self.settings = ai_game.settings
 
         # Loads the alien image and sets its rect attribute.
-        self.image = pygame.image.load("images/alien.bmp")
+        self.image = ai_game.assets.load_image("images/alien.bmp")
         self.rect = self.image.get_rect()
 
+        # Shares one collision mask between every alien.
+        self.mask = ai_game.assets.load_mask("images/alien.bmp")
+
         # Starts each new alien near the top left of the screen.
         self.rect.x = self.rect.width
         self.rect.y = self.rect.height
-
-        # Stores the alien's exact horizontal position.
-        self.x = float(self.rect.x)
-
-
-    def check_edges(self):
-        """
-        Returns True if the alien is at the edge of the screen.
-        """
-        screen_rect = self.screen.get_rect()
-        return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)
-
-
-    def update(self):
-        """
-        Moves the alien to the right.
-        """
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
-        self.rect.x = self.x
\ No newline at end of file
@@ -1,37 +1,97 @@
+from time import perf_counter
+
+# Read before the other imports, so startup profiling can time them.
+_imports_started = perf_counter()
+
+import argparse
+import os
 import sys
-from time import sleep
-from pathlib import Path
 
 import pygame
 from settings import Settings
+from assets import AssetCache
 from game_stats import GameStats
+from score_store import ScoreStore
 from scoreboard import Scoreboard
 from button import Button
 from ship import Ship
 from bullet import Bullet
-from alien import Alien
+from fleet import Fleet
+from pool import SpritePool
+from game_state import GamePhase, GameState
+from profiler import FrameProfiler, NullProfiler
+from replay import InputRecorder
+from frame_export import FrameExporter
+from telemetry import Event, NullTelemetry, Telemetry
+from text import TextCache
+from pacing import FramePacer
+from renderer import FlipRenderer, DirtyRenderer
+from startup import StartupTimer
 
 class AlienInvasion:
     """
     Overall class to manage game assets and behavior.
     """
-    def __init__(self):
+    def __init__(self, headless=False, settings=None, startup=None):
         """
         Initializes the game and creates game resources.
+
+        A headless game uses SDL's dummy video driver and draws nothing, so
+        it can be stepped with simulate() as fast as the CPU allows. startup
+        is a StartupTimer to time initialization with; a new one is started
+        if none is given.
         """
-        pygame.init()
+        self.startup = startup or StartupTimer()
+        self.headless = headless
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+        # Starts only the subsystems the game uses; pygame.init() would also
+        # bring up audio and joysticks.
+        pygame.display.init()
+        pygame.font.init()
+        self.startup.mark("pygame init")
 
         # Initiates the Clock so that the game runs at the same frame rate on
         # all systems.
         self.clock = pygame.time.Clock()
 
         # Use the Settings provided.
-        self.settings = Settings()
+        self.settings = settings or Settings()
+
+        # Paces frames the way the settings ask for.
+        self.pacer = FramePacer(self)
 
-        # Runs the game in windowed mode.
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))        
-        pygame.display.set_caption("Alien Invasion")
+        if self.headless:
+            # A tiny display mode is still needed to convert images; the game
+            # itself runs on its own off-screen surface.
+            pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface(
+                (self.settings.screen_width, self.settings.screen_height))
+        else:
+            # Runs the game in windowed mode.
+            self.screen = self.pacer.set_display_mode(
+                (self.settings.screen_width, self.settings.screen_height))
+            pygame.display.set_caption("Alien Invasion")
+        self.startup.mark("display")
+
+        # Loads each image once and shares it between sprites, starting from
+        # the prebuilt bundle when there is one.
+        self.assets = AssetCache()
+        if self.settings.asset_bundle:
+            self.assets.load_bundle(self.settings.asset_bundle)
+        self.startup.mark("assets")
+
+        # Renders and caches text for the scoreboard and buttons with one
+        # shared font. Font(None) is the same default font SysFont(None)
+        # falls back to, without scanning the system's fonts first.
+        self.font = pygame.font.Font(None, 48)
+        self.text_cache = TextCache(self.font)
+        self.startup.mark("font")
+
+        # Saves high scores and finished runs in the background.
+        self.score_store = ScoreStore(self.settings.high_score_file,
+                                      self.settings.score_history_file)
 
         # Creates an instance to store game statistics, along with a scoreboard.
         self.stats = GameStats(self)
@@ -39,38 +99,179 @@ class AlienInvasion:
 
         # Creates a Ship. The instance of AlienInvasion is 'self'.
         self.ship = Ship(self)
+        self.startup.mark("scoreboard and ship")
 
-        # Creates the bullets that the Ship will fire.
+        # Creates the bullets that the Ship will fire, and a pool to reuse
+        # them from.
         self.bullets = pygame.sprite.Group()
+        self.bullet_pool = SpritePool(lambda: Bullet(self),
+                                      self.settings.bullets_allowed)
 
-        # Creates the Aliens!
+        # Creates the Aliens! The fleet moves them; the group draws them.
         self.aliens = pygame.sprite.Group()
+        self.fleet = Fleet(self)
         self._create_fleet()
+        self.startup.mark("fleet")
 
         # Sets the background color of the screen.
         self.bg_color = (230, 230, 230)
 
-        # Starts Alien Invasion in an inactive state.
-        self.game_active = False
+        # Starts Alien Invasion in the menu, and counts logic steps.
+        self.state = GameState(self)
+        self.frame_count = 0
 
         # Makes the Play button.
         self.play_button = Button(self, "Play")
 
+        # Times each phase of a frame when profiling is switched on.
+        if self.settings.profile:
+            self.profiler = FrameProfiler(self)
+        else:
+            self.profiler = NullProfiler()
+
+        # Logs frames and game events when telemetry is switched on.
+        if self.settings.telemetry_file:
+            self.telemetry = Telemetry(self)
+        else:
+            self.telemetry = NullTelemetry()
+
+        # Logs every frame's input when the game is being recorded.
+        self.recorder = None
+
+        # Shares every drawn frame with other processes when asked to.
+        self.frame_export = None
+        if self.settings.frame_export:
+            self.frame_export = FrameExporter(self)
+
+        # Picks how frames are drawn to the display.
+        if self.settings.render_mode == "dirty":
+            self.renderer = DirtyRenderer(self)
+        else:
+            self.renderer = FlipRenderer(self)
+        self.startup.mark("game objects")
+
 
     def run_game(self):
         """
         Starts the main loop for the game.
+
+        With a fixed timestep, the logic runs in steps of 1 / logic_fps
+        seconds however long frames take, and the leftover fraction of a
+        step can be used to interpolate what is drawn. Otherwise the logic
+        advances by each frame's measured time.
         """
+        step_time = 1 / self.settings.logic_fps
+        frame_time = 0.0
+        lag = 0.0
+        first_frame = True
+
         while True:
+            self.profiler.begin_frame()
             self._check_events()
+            self.profiler.lap("events")
+
+            if self.settings.fixed_timestep:
+                lag += frame_time
+
+                # Frames paced at the logic rate still measure a little
+                # over or under one step, which would otherwise add up to
+                # frames with no step or two. Lag within timestep_snap of a
+                # whole number of steps, one or more, runs that many. What
+                # is left stays in lag, a little below zero if the steps
+                # ran ahead, so game time still keeps up with wall time.
+                steps = max(1, round(lag / step_time))
+                if abs(lag - steps * step_time) >= \
+                        self.settings.timestep_snap * step_time:
+                    steps = max(0, int(lag // step_time))
+
+                for _ in range(steps):
+                    self._record_input()
+                    self.profiler.lap("events")
+                    self._step(step_time)
+                lag -= steps * step_time
+                alpha = min(max(lag / step_time, 0.0), 1.0)
+            else:
+                self._record_input()
+                self.profiler.lap("events")
+                self._step(frame_time)
+                alpha = 1.0
+
+            self._update_screen(alpha)
+            self.profiler.lap("screen")
+            self.profiler.end_frame()
 
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-            
-            self._update_screen()
-            self.clock.tick(60)
+            if first_frame:
+                first_frame = False
+                self.startup.mark("first frame")
+                if self.settings.startup_profile:
+                    print(self.startup.report())
+
+            frame_time = self.pacer.tick(self.renderer.presented)
+            self.telemetry.emit(Event.FRAME, value=frame_time)
+
+            # Caps the measured time so a stall doesn't lurch the game ahead.
+            frame_time = min(frame_time, self.settings.max_frame_time)
+
+
+    def simulate(self, max_frames, controller=None):
+        """
+        Runs up to max_frames logic steps without drawing or waiting.
+
+        Starts a new game first if none is running. controller, if given, is
+        called with the game before every step so a script can steer the
+        ship. Stops early once the game is over, and returns the number of
+        steps that were run.
+        """
+        self._start_game()
+
+        for frame in range(max_frames):
+            self.profiler.begin_frame()
+            if controller:
+                controller(self)
+            self.profiler.lap("events")
+            self._step()
+            self.profiler.end_frame()
+
+            if not self.game_active:
+                return frame + 1
+        return max_frames
+
+
+    def _record_input(self):
+        """
+        Logs the input for the logic step about to run, if recording.
+        """
+        if self.recorder:
+            self.recorder.end_frame(self)
+
+
+    def _step(self, dt=None):
+        """
+        Advances the game logic by dt seconds, one fixed timestep by default.
+        """
+        if dt is None:
+            dt = 1 / self.settings.logic_fps
+        self.frame_count += 1
+
+        # Remembers where everything was, for interpolated drawing.
+        self.ship.save_position()
+        for bullet in self.bullets.sprites():
+            bullet.save_position()
+        self.fleet.save_position()
+
+        # Runs the timers of the respawn and game-over pauses.
+        if self.state.update(dt) is GamePhase.MENU:
+            pygame.mouse.set_visible(True)
+
+        if self.state.phase is GamePhase.PLAYING:
+            self.ship.update(dt)
+            self.profiler.lap("ship")
+            self._update_bullets(dt)
+            self._update_aliens(dt)
+
+            # Gets the next fleet ready a little at a time.
+            self.fleet.prewarm()
+            self.profiler.lap("aliens")
 
 
     def _check_events(self):
@@ -79,7 +280,7 @@ class AlienInvasion:
         """
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit_game()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
@@ -87,6 +288,9 @@ class AlienInvasion:
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 self._check_play_button(mouse_pos)
+            elif event.type == pygame.VIDEOEXPOSE:
+                # The window was uncovered, so everything must be redrawn.
+                self.renderer.invalidate()
 
 
     def _check_play_button(self, mouse_pos):
@@ -94,6 +298,9 @@ class AlienInvasion:
         Starts a new game when the player clicks Play.
         """
         if self.play_button.rect.collidepoint(mouse_pos):
+            if self.recorder:
+                # Recorded as a press of p, which does the same thing.
+                self.recorder.key_pressed(pygame.K_p)
             self._start_game()
 
     
@@ -101,6 +308,9 @@ class AlienInvasion:
         """
         Responds to keypresses.
         """
+        if self.recorder:
+            self.recorder.key_pressed(event.key)
+
         if event.key == pygame.K_RIGHT:
             # Moves the ship to the right.
             self.ship.moving_right = True
@@ -109,20 +319,35 @@ class AlienInvasion:
             self.ship.moving_left = True
         elif event.key == pygame.K_q:
             # Quits the game when the 'q' button is pressed.
-            self._write_high_score(self.stats.high_score)
-            sys.exit()
+            self._quit_game()
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
         elif event.key == pygame.K_p:
             self._start_game()
 
     
+    def _quit_game(self):
+        """
+        Saves the high score, finishes any profiling output and exits.
+        """
+        self._write_high_score(self.stats.high_score)
+        self.score_store.close()
+        self.profiler.close()
+        self.telemetry.close()
+        if self.settings.report_pacing:
+            print(self.pacer.report())
+        if self.recorder:
+            self.recorder.close()
+        if self.frame_export:
+            self.frame_export.close()
+        sys.exit()
+
+
     def _write_high_score(self, high_score):
         """
         Writes the new high score to a file to use for later.
         """
-        score_path = Path("high_score.txt")
-        score_path.write_text(str(high_score))
+        self.score_store.save_high_score(high_score)
 
 
     def _start_game(self):
@@ -133,14 +358,11 @@ class AlienInvasion:
             # Resets the game statistics.
             self.settings.initialize_dynamic_settings()
             self.stats.reset_stats()
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            self.game_active = True
+            self.state.enter(GamePhase.PLAYING)
 
             # Gets rid of any remaining bullets and aliens.
-            self.bullets.empty()
-            self.aliens.empty()
+            self._clear_bullets()
+            self.fleet.empty()
 
             # Creates a new fleet and centers the ship.
             self._create_fleet()
@@ -159,31 +381,53 @@ class AlienInvasion:
             self.ship.moving_left = False
 
 
+    @property
+    def game_active(self):
+        """
+        Returns True while a game is in progress, pauses included.
+        """
+        return self.state.game_active
+
+
     def _fire_bullet(self):
         """
         Creates a new bullet and adds it to the bullets group.
         """
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
+        if (self.state.phase is GamePhase.PLAYING
+                and len(self.bullets) < self.settings.bullets_allowed):
+            new_bullet = self.bullet_pool.acquire()
+            new_bullet.reset(self.ship)
             self.bullets.add(new_bullet)
+            self.telemetry.emit(Event.SHOT, len(self.bullets))
+
+
+    def _clear_bullets(self):
+        """
+        Returns every bullet in flight to the bullet pool.
+        """
+        for bullet in self.bullets.sprites():
+            self.bullet_pool.release(bullet)
 
     
-    def _update_bullets(self):
+    def _update_bullets(self, dt):
         """
         Updates position of bullets and gets rid of old bullets.
         """
         # Updates bullet positions.
-        self.bullets.update()
+        self.bullets.update(dt)
 
         # Gets rid of bullets that have disappeared from the screen.
-        for bullet in self.bullets.copy():
+        for bullet in self.bullets.sprites():
             if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+                self.bullet_pool.release(bullet)
 
         # # Test to see if the bullets are indeed removed.
         # print(len(self.bullets))
 
+        self.profiler.lap("bullets")
+
         self._check_bullet_alien_collisions()
+        self.profiler.lap("collisions")
 
 
     def _check_bullet_alien_collisions(self):
@@ -191,156 +435,137 @@ class AlienInvasion:
         Responds to bullet-alien collisions.
         """
         # Removes any bullets and aliens that have collided.
-        collisions = pygame.sprite.groupcollide(
-            self.bullets, self.aliens, True, True)
+        collisions = self.fleet.collide_bullets(self.bullets)
         
         if collisions:
-            for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
-            self.sb.prep_score()
-            self.sb.check_high_score()
+            for bullet, aliens in collisions.items():
+                self.bullet_pool.release(bullet)
+                points = self.settings.alien_points * len(aliens)
+                self.stats.add_score(points)
+                self.telemetry.emit(Event.KILL, len(aliens), points)
         
         if not self.aliens:
             # Destroys existing bullets and creates new fleet.
-            self.bullets.empty()
+            self._clear_bullets()
             self._create_fleet()
             self.settings.increase_speed()
 
             # Increases level.
             self.stats.level += 1
-            self.sb.prep_level()
+            self.telemetry.emit(Event.LEVEL_UP, self.stats.level)
 
 
-    def _update_aliens(self):
+    def _update_aliens(self, dt):
         """
         Checks if the fleet is at an edge, then updates positions.
         """
         self._check_fleet_edges()
-        self.aliens.update()
+        self.fleet.update(dt)
 
         # Looks for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.fleet.collides_with(self.ship.rect, self.ship.mask):
             self._ship_hit()
 
         # Looks for aliens hitting the bottom of the screen.
         self._check_aliens_bottom()
 
     
-    def _create_alien(self, x_position, y_position):
-        """
-        Creates an alien and places it in the row.
-        """
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        self.aliens.add(new_alien)
-
-
     def _check_fleet_edges(self):
         """
         Responds appropriately if any aliens have reached an edge.
         """
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.fleet.check_edges():
+            self._change_fleet_direction()
 
 
     def _check_aliens_bottom(self):
         """
         Checks if any aliens have reached the bottom of the screen.
         """
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                # Treats this the same as if the ship got hit.
-                self._ship_hit()
-                break
+        if self.fleet.reached_bottom():
+            # Treats this the same as if the ship got hit.
+            self._ship_hit()
 
 
     def _change_fleet_direction(self):
         """
         Drops the entire fleet and changes the fleet's direction.
         """
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-        self.settings.fleet_direction *= -1
+        self.fleet.change_direction()
 
 
     def _create_fleet(self):
         """
-        Creates the fleet of aliens.
+        Creates the fleet of aliens from the cached layout.
         """
-        # Creates an alien and keeps adding aliens until there's no room left.
-        # Spacing between aliens is one alien width and one alien height.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-
-            # Finished a row: resets x value and increments y value.
-            current_x = alien_width
-            current_y += 2 * alien_height
+        self.fleet.spawn()
 
 
     def _ship_hit(self):
         """
         Responds to the ship being hit by an alien.
         """
+        self.telemetry.emit(Event.SHIP_HIT, self.stats.ships_left)
         if self.stats.ships_left > 0:
-            # Decrements ships left and update the scorebaord.
+            # Decrements ships left; the scoreboard catches up next frame.
             self.stats.ships_left -= 1
-            self.sb.prep_ships()
 
             # Gets rid of any remaining bullets and aliens.
-            self.bullets.empty()
-            self.aliens.empty()
+            self._clear_bullets()
+            self.fleet.empty()
 
             # Creates a new fleet and centers the ship.
             self._create_fleet()
             self.ship.center_ship()
 
-            # Pauses.
-            sleep(0.5)
+            # Pauses on the frame clock while events keep being handled.
+            self.state.enter(GamePhase.RESPAWN, self.settings.hit_pause)
 
         else:
-            self.game_active = False
-            pygame.mouse.set_visible(True)
+            # Saves the finished run without waiting on the disk.
+            self._write_high_score(self.stats.high_score)
+            self.score_store.record_run(self.stats.score, self.stats.level)
+            self.state.enter(GamePhase.GAME_OVER,
+                             self.settings.game_over_pause)
 
 
-    def _update_screen(self):
-        """
-        Updates images on the screen, and flips them to the new screen.
+    def _update_screen(self, alpha=1.0):
         """
-        # Redraws the screen during each pass of the loop.
-        self.screen.fill(self.settings.bg_color)
+        Updates images on the screen, and sends them to the display.
 
-        # Adds the bullets into the bullets group.
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-
-        # Draws the Ship.
-        self.ship.blitme()
-
-        # Draws the aliens.
-        self.aliens.draw(self.screen)
-
-        # Draws the score information.
-        self.sb.show_score()
-
-        # Draws the Play button if the game is inactive.
-        if not self.game_active:
-            self.play_button.draw_button()
-
-        # Makes the most recently drawn screen visible
-        pygame.display.flip()
+        alpha is how far the game is between its last two logic steps.
+        """
+        # Brings the scoreboard up to date once for the whole frame.
+        self.stats.flush()
+        self.renderer.draw(alpha)
+        if self.frame_export:
+            self.frame_export.publish()
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays Alien Invasion.")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record every frame's input to PATH for replay.py")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="log frames and game events to PATH")
+    parser.add_argument("--export-frames", metavar="NAME",
+                        help="share every frame in shared memory called NAME")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each stage of startup took")
+    args = parser.parse_args()
+
+    startup = StartupTimer(_imports_started)
+    startup.mark("imports")
+    settings = Settings()
+    settings.startup_profile = args.startup_profile
+    settings.frame_export = args.export_frames
+    settings.telemetry_file = args.telemetry
+
     # Makes a game instance and runs the game.
-    ai = AlienInvasion()
+    ai = AlienInvasion(settings=settings, startup=startup)
+    if args.record:
+        try:
+            ai.recorder = InputRecorder(args.record, ai.settings)
+        except ValueError as error:
+            parser.error(str(error))
     ai.run_game()
@@ -0,0 +1,220 @@
+"""
+Loads the game's images, from a prebuilt bundle when there is one.
+
+Running this file builds the bundle, so startup can skip decoding images:
+
+    python assets.py
+"""
+import glob
+import os
+import struct
+
+import pygame
+
+
+# A bundle is a header followed by one entry per image. Each entry holds its
+# path, whether it keeps per-pixel alpha, its size, the modification time
+# and size of the file it was decoded from, and its raw pixels.
+BUNDLE_MAGIC = b"AIAB"
+BUNDLE_VERSION = 2
+BUNDLE_HEADER = struct.Struct("<4sBH")
+ENTRY_HEADER = struct.Struct("<HBHHIqQ")
+
+
+class AssetCache:
+    """
+    A class to load each image once and share it across the game.
+    """
+    def __init__(self):
+        """
+        Initializes an empty cache along with its hit and miss counters.
+        """
+        self.images = {}
+        self.solids = {}
+        self.masks = {}
+        self.hits = 0
+        self.misses = 0
+
+
+    def load_image(self, path, alpha=False):
+        """
+        Returns the shared surface for path, loading it on first use.
+
+        The image is converted to the display's pixel format, so the display
+        mode must already be set before the first call.
+        """
+        key = (path, alpha)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = pygame.image.load(path)
+        image = image.convert_alpha() if alpha else image.convert()
+        self.images[key] = image
+        return image
+
+
+    def solid(self, size, color):
+        """
+        Returns a shared surface of size filled with color, made on first
+        use, so plain rects can be blitted along with images.
+        """
+        key = (tuple(size), tuple(color))
+        surface = self.solids.get(key)
+        if surface is None:
+            surface = pygame.Surface(key[0]).convert()
+            surface.fill(color)
+            self.solids[key] = surface
+        return surface
+
+
+    def load_mask(self, path, alpha=False):
+        """
+        Returns the shared collision mask for the image at path, building
+        it on first use.
+
+        An alpha image's mask holds its opaque pixels. Other images are
+        drawn on a flat background, so their mask holds every pixel that
+        differs from the top-left one.
+        """
+        key = (path, alpha)
+        mask = self.masks.get(key)
+        if mask is None:
+            image = self.load_image(path, alpha)
+            if alpha:
+                mask = pygame.mask.from_surface(image)
+            else:
+                mask = pygame.mask.from_threshold(image, image.get_at((0, 0)),
+                                                  (1, 1, 1, 255))
+                mask.invert()
+            self.masks[key] = mask
+        return mask
+
+
+    def full_mask(self, size):
+        """
+        Returns a shared mask of size with every pixel set, for shapes that
+        fill their rect.
+        """
+        mask = self.masks.get(size)
+        if mask is None:
+            mask = pygame.Mask(size, fill=True)
+            self.masks[size] = mask
+        return mask
+
+
+    def load_bundle(self, path):
+        """
+        Fills the cache from a bundle written by build_bundle().
+
+        The pixels are stored in the layout the game converts to, so each
+        image only needs copying into the display's format rather than
+        decoding. Images whose file changed since the bundle was built are
+        skipped, and so is a bundle that is missing, damaged or not a
+        bundle at all; anything skipped is decoded when first used.
+        Returns the number of images loaded.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            images = _read_bundle(data)
+        except (OSError, struct.error, ValueError):
+            return 0
+
+        self.images.update(images)
+        return len(images)
+
+
+    def stats(self):
+        """
+        Returns the hit and miss counts of the cache.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "images": len(self.images)}
+
+
+    def clear(self):
+        """
+        Drops every cached image, surface and mask and resets the counters.
+        """
+        self.images.clear()
+        self.solids.clear()
+        self.masks.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _read_bundle(data):
+    """
+    Returns the images of a bundle whose files are unchanged, keyed by
+    (path, alpha) as in AssetCache.images.
+
+    Raises struct.error or ValueError if data isn't a whole bundle.
+    """
+    magic, version, count = BUNDLE_HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+        raise ValueError("not an asset bundle")
+
+    images = {}
+    offset = BUNDLE_HEADER.size
+    view = memoryview(data)
+    for _ in range(count):
+        name_length, alpha, width, height, size, mtime, file_size = \
+            ENTRY_HEADER.unpack_from(data, offset)
+        offset += ENTRY_HEADER.size
+        name = bytes(view[offset:offset + name_length]).decode()
+        offset += name_length
+        pixels = view[offset:offset + size]
+        offset += size
+        if len(pixels) != size:
+            raise ValueError("truncated asset bundle")
+
+        # An image whose file has gone keeps its bundled pixels.
+        try:
+            source = os.stat(name)
+        except OSError:
+            source = None
+        if source and (source.st_mtime_ns, source.st_size) != \
+                (mtime, file_size):
+            continue
+
+        image = pygame.image.frombuffer(pixels, (width, height),
+                                        "RGBA" if alpha else "RGB")
+        image = image.convert_alpha() if alpha else image.convert()
+        images[(name, bool(alpha))] = image
+    return images
+
+
+def build_bundle(bundle_path, paths, alpha_paths=()):
+    """
+    Decodes every image in paths and writes them all to one bundle file.
+
+    Images in alpha_paths keep their per-pixel alpha.
+    """
+    entries = [(path, False) for path in paths]
+    entries += [(path, True) for path in alpha_paths]
+
+    with open(bundle_path, "wb") as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(entries)))
+        for path, alpha in entries:
+            source = os.stat(path)
+            image = pygame.image.load(path)
+            pixels = pygame.image.tobytes(image, "RGBA" if alpha else "RGB")
+            name = path.encode()
+            f.write(ENTRY_HEADER.pack(len(name), alpha, image.get_width(),
+                                      image.get_height(), len(pixels),
+                                      source.st_mtime_ns, source.st_size))
+            f.write(name)
+            f.write(pixels)
+    return len(entries)
+
+
+if __name__ == '__main__':
+    from settings import Settings
+
+    bundle_path = Settings().asset_bundle
+    count = build_bundle(bundle_path, sorted(glob.glob("images/*.bmp")))
+    print(f"Wrote {count} images to {bundle_path}")
@@ -0,0 +1,172 @@
+"""
+Plays many headless games in parallel for balance tuning.
+
+Every combination of --set values is played --games times, each with its
+own seed, across a pool of worker processes. Each game's result is
+streamed to a JSON lines file as it finishes, and a summary per settings
+combination is printed at the end.
+
+    python batch.py --games 500 --set speedup_scale=1.1,1.2 \\
+        --set bullets_allowed=3,5
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+from settings import Settings
+
+
+class RandomPilot:
+    """
+    A class to steer the ship with seeded random input.
+    """
+    def __init__(self, seed):
+        """
+        Initializes the pilot's random number generator.
+        """
+        self.random = random.Random(seed)
+
+
+    def __call__(self, ai_game):
+        """
+        Now and then changes direction, and fires whenever it can.
+        """
+        ship = ai_game.ship
+        if self.random.random() < 0.05:
+            direction = self.random.choice((-1, 0, 1))
+            ship.moving_left = direction < 0
+            ship.moving_right = direction > 0
+        if self.random.random() < 0.5:
+            ai_game._fire_bullet()
+
+
+def make_settings(overrides):
+    """
+    Returns Settings with the given attributes replaced.
+
+    The replacements are kept in the settings' overrides, so those that
+    initialize_dynamic_settings() resets for every game stay replaced.
+    """
+    settings = Settings()
+    for name, value in overrides.items():
+        if not hasattr(settings, name) or name == "overrides":
+            raise ValueError(f"unknown setting: {name}")
+        setattr(settings, name, value)
+        settings.overrides[name] = value
+
+    # Worker games never touch the player's saved scores.
+    settings.high_score_file = None
+    settings.score_history_file = None
+    return settings
+
+
+def play_game(overrides, seed, max_frames):
+    """
+    Plays one headless game and returns its result.
+    """
+    from alien_invasion import AlienInvasion
+
+    start = perf_counter()
+    ai_game = AlienInvasion(headless=True, settings=make_settings(overrides))
+    frames = ai_game.simulate(max_frames, RandomPilot(seed))
+
+    # Stops the game's background writer, which would otherwise be left
+    # behind by every game a worker plays.
+    ai_game.score_store.close()
+    return {"overrides": overrides,
+            "seed": seed,
+            "score": ai_game.stats.score,
+            "level": ai_game.stats.level,
+            "frames": frames,
+            "wall_time": perf_counter() - start}
+
+
+def summarize(results):
+    """
+    Returns summary statistics for each settings combination.
+    """
+    groups = {}
+    for result in results:
+        key = json.dumps(result["overrides"], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for key, group in groups.items():
+        scores = [result["score"] for result in group]
+        levels = [result["level"] for result in group]
+        summary.append({"overrides": json.loads(key),
+                        "games": len(group),
+                        "mean_score": statistics.mean(scores),
+                        "median_score": statistics.median(scores),
+                        "max_score": max(scores),
+                        "mean_level": statistics.mean(levels),
+                        "max_level": max(levels),
+                        "mean_frames": statistics.mean(
+                            result["frames"] for result in group)})
+    return summary
+
+
+def _parse_override(text):
+    """
+    Turns NAME=V1,V2,... into (NAME, [values]), parsing values as JSON.
+    """
+    name, _, values = text.partition("=")
+    parsed = []
+    for value in values.split(","):
+        try:
+            parsed.append(json.loads(value))
+        except ValueError:
+            parsed.append(value)
+    return name, parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per settings combination")
+    parser.add_argument("--set", dest="overrides", action="append",
+                        type=_parse_override, default=[],
+                        metavar="NAME=V1,V2", help="settings values to try")
+    parser.add_argument("--max-frames", type=int, default=60 * 60 * 10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="batch_results.jsonl")
+    args = parser.parse_args(argv)
+
+    names = [name for name, _ in args.overrides]
+    combinations = [dict(zip(names, values)) for values in
+                    itertools.product(*(values for _, values in args.overrides))]
+    for overrides in combinations:
+        # Fails early on a typo instead of once per game.
+        make_settings(overrides)
+
+    results = []
+    start = perf_counter()
+    with ProcessPoolExecutor(args.workers) as executor, \
+            open(args.output, "w") as output:
+        futures = [executor.submit(play_game, overrides, args.seed + game,
+                                   args.max_frames)
+                   for overrides in combinations
+                   for game in range(args.games)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            output.write(json.dumps(result) + "\n")
+    elapsed = perf_counter() - start
+
+    frames = sum(result["frames"] for result in results)
+    print(f"{len(results)} games, {frames} frames in {elapsed:.1f} s "
+          f"({len(results) / elapsed:.1f} games/s, "
+          f"{frames / elapsed:.0f} frames/s) on {args.workers} workers")
+    print(json.dumps(summarize(results), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
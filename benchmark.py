@@ -0,0 +1,249 @@
+"""
+Benchmarks the game loop's subsystems on headless games.
+
+Runs every combination of screen size, fleet size and bullet count with
+the same scripted input, then writes frame rates and per-call latencies to
+a JSON file. With --compare, flags anything that got slower than a saved
+baseline and exits with status 1.
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json
+"""
+import argparse
+import itertools
+import json
+import math
+import sys
+from time import perf_counter_ns
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from percentiles import percentile
+
+
+# Game methods timed during each run, and the scoreboard's prep methods.
+GAME_METHODS = ("_create_fleet", "_update_aliens",
+                "_check_bullet_alien_collisions", "_update_screen")
+SCOREBOARD_METHODS = ("prep_score", "prep_high_score", "prep_level",
+                      "prep_ships")
+
+
+def _timed(function, samples):
+    """
+    Wraps function so every call's duration is appended to samples.
+    """
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        result = function(*args, **kwargs)
+        samples.append(perf_counter_ns() - start)
+        return result
+    return wrapper
+
+
+def _percentiles(samples):
+    """
+    Returns the mean, p50 and p99 of samples in milliseconds.
+    """
+    if not samples:
+        return {"calls": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    ordered = sorted(samples)
+    return {"calls": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered) / 1e6,
+            "p50_ms": percentile(ordered, 50) / 1e6,
+            "p99_ms": percentile(ordered, 99) / 1e6}
+
+
+def _scripted_input(ai_game):
+    """
+    Sweeps the ship from side to side and fires on every frame.
+    """
+    sweep = (ai_game.frame_count // 90) % 2 == 0
+    ai_game.ship.moving_right = sweep
+    ai_game.ship.moving_left = not sweep
+    ai_game._fire_bullet()
+
+
+def _packed_fleet(ai_game, size):
+    """
+    Returns positions for size aliens packed into a grid above the ship.
+
+    The grid takes the left half of the screen, so the fleet can travel
+    half a screen between drops, and stops a few alien heights above the
+    ship. Aliens overlap where size doesn't fit edge to edge.
+    """
+    settings = ai_game.settings
+    width, height = ai_game.fleet.alien_width, ai_game.fleet.alien_height
+    area_width = settings.screen_width // 2 - width
+    area_height = (settings.screen_height - ai_game.ship.rect.height
+                   - 4 * height)
+
+    # Picks columns and rows in the shape of the area.
+    columns = max(1, min(size, math.ceil(
+        math.sqrt(size * area_width / area_height))))
+    rows = math.ceil(size / columns)
+    step_x = min(width, (area_width - width) / max(1, columns - 1))
+    step_y = min(height, (area_height - height) / max(1, rows - 1))
+    return [(width + int(i % columns * step_x),
+             height + int(i // columns * step_y))
+            for i in range(size)]
+
+
+def run_case(resolution, fleet_size, bullets, frames):
+    """
+    Runs one benchmark case and returns its results.
+
+    fleet_size of None keeps the game's own fleet layout.
+    """
+    settings = Settings()
+    settings.screen_width, settings.screen_height = resolution
+    settings.bullets_allowed = bullets
+
+    # Benchmark games never touch the player's saved scores.
+    settings.high_score_file = None
+    settings.score_history_file = None
+
+    ai_game = AlienInvasion(headless=True, settings=settings)
+    samples = {name: [] for name in GAME_METHODS + SCOREBOARD_METHODS}
+    for name in GAME_METHODS:
+        setattr(ai_game, name, _timed(getattr(ai_game, name), samples[name]))
+    for name in SCOREBOARD_METHODS:
+        setattr(ai_game.sb, name,
+                _timed(getattr(ai_game.sb, name), samples[name]))
+
+    # Times the fleet layout and the scoreboard text directly, since the
+    # game only calls them now and then.
+    for i in range(20):
+        ai_game._create_fleet()
+        ai_game.stats.score = i * 1230
+        ai_game.stats.level = i + 1
+        for name in SCOREBOARD_METHODS:
+            getattr(ai_game.sb, name)()
+
+    packed = None
+    if fleet_size is not None:
+        packed = _packed_fleet(ai_game, fleet_size)
+        template = ai_game.fleet.template(packed)
+
+    frame_times = []
+    spawns = 0
+    for _ in range(frames):
+        if not ai_game.game_active:
+            ai_game._start_game()
+
+        # Brings the packed fleet back whenever a lost ship, a level-up or
+        # a new game replaced it with the standard one.
+        if packed is not None and ai_game.fleet.home_x is not template.home_x:
+            ai_game.fleet.spawn(packed)
+            spawns += 1
+        if packed is not None and len(ai_game.fleet.home_x) != fleet_size:
+            raise RuntimeError(f"the benchmark fleet shrank to "
+                               f"{len(ai_game.fleet.home_x)} aliens")
+
+        start = perf_counter_ns()
+        _scripted_input(ai_game)
+        ai_game._step()
+        ai_game._update_screen()
+        frame_times.append(perf_counter_ns() - start)
+
+    total = sum(frame_times)
+    return {"name": f"{resolution[0]}x{resolution[1]}"
+                    f"-fleet{fleet_size or 'default'}-bullets{bullets}",
+            "params": {"resolution": list(resolution),
+                       "fleet_size": fleet_size,
+                       "bullets": bullets,
+                       "frames": frames},
+            "fleet_spawns": spawns,
+            "fps": len(frame_times) * 1e9 / total if total else 0.0,
+            "frame": _percentiles(frame_times),
+            "timings": {name: _percentiles(values)
+                        for name, values in samples.items()}}
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.0, min_calls=0):
+    """
+    Returns a description of every p50 that regressed past threshold.
+
+    A p50 only counts as a regression if it also grew by at least
+    min_delta_ms, and both runs timed at least min_calls calls, so noise
+    in tiny or rarely called timings isn't flagged.
+    """
+    regressions = []
+    old_cases = {case["name"]: case for case in baseline["cases"]}
+    for case in results["cases"]:
+        old = old_cases.get(case["name"])
+        if old is None:
+            continue
+
+        timings = dict(case["timings"], frame=case["frame"])
+        old_timings = dict(old["timings"], frame=old["frame"])
+        for name, timing in timings.items():
+            old_timing = old_timings.get(name, {})
+            before = old_timing.get("p50_ms", 0.0)
+            after = timing["p50_ms"]
+            if min(timing["calls"], old_timing.get("calls", 0)) < min_calls:
+                continue
+            if (before and after > before * (1 + threshold)
+                    and after - before >= min_delta_ms):
+                regressions.append(f"{case['name']} {name}: "
+                                   f"{before:.3f} ms -> {after:.3f} ms "
+                                   f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _parse_resolution(text):
+    """
+    Turns a WIDTHxHEIGHT string into a (width, height) tuple.
+    """
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def _parse_fleet_size(text):
+    """
+    Turns a fleet size argument into an int, or None for the default.
+    """
+    return None if text == "default" else int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resolutions", nargs="+", type=_parse_resolution,
+                        default=[(1200, 800), (1920, 1080)])
+    parser.add_argument("--fleet-sizes", nargs="+", type=_parse_fleet_size,
+                        default=[None, 1000])
+    parser.add_argument("--bullets", nargs="+", type=int, default=[3, 50])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown before flagging (0.10 = 10%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="smallest p50 slowdown worth flagging")
+    parser.add_argument("--min-calls", type=int, default=50,
+                        help="fewest timed calls a p50 is compared on")
+    args = parser.parse_args(argv)
+
+    results = {"cases": []}
+    for resolution, fleet_size, bullets in itertools.product(
+            args.resolutions, args.fleet_sizes, args.bullets):
+        case = run_case(resolution, fleet_size, bullets, args.frames)
+        results["cases"].append(case)
+        print(f"{case['name']}: {case['fps']:.0f} FPS, "
+              f"p99 frame {case['frame']['p99_ms']:.3f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold,
+                              args.min_delta_ms, args.min_calls)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,32 +13,52 @@ class Bullet(Sprite):
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
-        self.color = self.settings.bullet_color
 
         # Creates a bullet rect at (0, 0) and then sets the correct position.
         self.rect = pygame.Rect(0, 
                                 0, 
                                 self.settings.bullet_width, 
                                 self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.reset(ai_game.ship)
 
-        # Stores the bullet's position as a float.
+        # Every bullet blits the same pre-filled surface.
+        self.image = ai_game.assets.solid(self.rect.size,
+                                          self.settings.bullet_color)
+
+
+    def reset(self, ship):
+        """
+        Moves the bullet back to the ship so it can be fired again.
+        """
+        self.rect.midtop = ship.rect.midtop
+
+        # Stores the bullet's position as a float, along with where it was
+        # before the last logic step.
         self.y = float(self.rect.y)
+        self.prev_y = self.y
+
+
+    def save_position(self):
+        """
+        Remembers the current position before a logic step.
+        """
+        self.prev_y = self.y
 
     
-    def update(self):
+    def update(self, dt):
         """
-        Moves the bullet up the screen.
+        Moves the bullet up the screen for dt seconds.
         """
         # Updates the exact position of the bullet.
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.bullet_speed * dt
 
         # updates the rect position.
         self.rect.y = self.y
 
 
-    def draw_bullet(self):
+    def draw_rect(self, alpha):
         """
-        Draws the bullet to the screen.
+        Returns the rect to draw the bullet at, alpha of the way between its
+        last two positions.
         """
-        pygame.draw.rect(self.screen, self.color, self.rect)
\ No newline at end of file
+        return self.rect.move(0, round((self.prev_y - self.y) * (1 - alpha)))
\ No newline at end of file
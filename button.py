@@ -1,4 +1,4 @@
-import pygame.font
+import pygame
 
 
 class Button:
@@ -16,11 +16,12 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 135, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.text_cache = ai_game.text_cache
 
         # Builds the button's rect object and centers it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.center = self.screen_rect.center
+        self.image = ai_game.assets.solid(self.rect.size, self.button_color)
 
         # Preps the button's message.
         self._prep_msg(msg)
@@ -30,10 +31,9 @@ class Button:
         """
         Turns msg into a rendered image and centers text on the button.
         """
-        self.msg_image = self.font.render(msg, 
-                                          True, 
-                                          self.text_color, 
-                                          self.button_color)
+        self.msg_image = self.text_cache.render(msg,
+                                                self.text_color,
+                                                self.button_color)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
@@ -42,5 +42,5 @@ class Button:
         """
         Draws a blank button and then draws the message.
         """
-        self.screen.fill(self.button_color, self.rect)
+        self.screen.blit(self.image, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
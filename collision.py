@@ -0,0 +1,63 @@
+class SpatialHash:
+    """
+    A class to find nearby objects with a uniform grid instead of a full scan.
+    """
+    def __init__(self, cell_width, cell_height):
+        """
+        Initializes an empty grid with the given cell size.
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+
+
+    def _cell_range(self, left, top, right, bottom):
+        """
+        Returns the cell keys covered by the given box.
+        """
+        first_col = int(left // self.cell_width)
+        last_col = int((right - 1) // self.cell_width)
+        first_row = int(top // self.cell_height)
+        last_row = int((bottom - 1) // self.cell_height)
+        return [(col, row)
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)]
+
+
+    def insert(self, item, left, top, right, bottom):
+        """
+        Adds item to every cell its box covers.
+        """
+        for key in self._cell_range(left, top, right, bottom):
+            self.cells.setdefault(key, set()).add(item)
+
+
+    def remove(self, item, left, top, right, bottom):
+        """
+        Removes item from every cell its box covers.
+        """
+        for key in self._cell_range(left, top, right, bottom):
+            cell = self.cells.get(key)
+            if cell is not None:
+                cell.discard(item)
+                if not cell:
+                    del self.cells[key]
+
+
+    def query(self, left, top, right, bottom):
+        """
+        Returns the set of items in the cells the given box covers.
+        """
+        found = set()
+        for key in self._cell_range(left, top, right, bottom):
+            cell = self.cells.get(key)
+            if cell:
+                found |= cell
+        return found
+
+
+    def clear(self):
+        """
+        Removes every item from the grid.
+        """
+        self.cells.clear()
@@ -0,0 +1,312 @@
+"""
+Wraps headless games in a reset()/step() environment for training agents.
+
+An action holds the same bits as a recorded frame of input (see replay.py):
+LEFT and RIGHT steer the ship and SPACE fires. The reward is the score
+gained by the step. Observations are either a vector of ship, bullet and
+alien positions, or a downsampled frame, which is the only case that draws
+anything.
+
+    env = AlienInvasionEnv()
+    observation, info = env.reset()
+    observation, reward, terminated, truncated, info = env.step(RIGHT | SPACE)
+
+VectorEnv steps several games in lockstep and resets each as it finishes.
+Running this file measures the steps per second:
+
+    python env.py --envs 8 --steps 20000 --observation pixels
+"""
+import argparse
+import random
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from batch import make_settings
+from frame_export import (channel_offsets, downsample, frame_shape,
+                          pixels_view, rgb_view)
+from game_state import GamePhase
+from replay import LEFT, RIGHT, SPACE
+
+
+# Every combination of the action bits.
+ACTIONS = 8
+
+
+class AlienInvasionEnv:
+    """
+    A class to play one headless game of Alien Invasion an action at a time.
+    """
+    observations = ("vector", "pixels")
+
+    def __init__(self, overrides=None, observation="vector", frame_skip=1,
+                 pixel_scale=4, grayscale=False, max_steps=None):
+        """
+        Creates the game behind the environment.
+
+        overrides replaces settings as in batch.py. Each step repeats its
+        action for frame_skip logic steps. Pixel observations keep every
+        pixel_scale-th pixel of each row and column, and can be grayscale.
+        An episode is cut short after max_steps steps if that is given.
+        """
+        from alien_invasion import AlienInvasion
+
+        if observation not in self.observations:
+            raise ValueError(f"unknown observation: {observation}")
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.pixel_scale = pixel_scale
+        self.grayscale = grayscale
+        self.max_steps = max_steps
+
+        self.game = AlienInvasion(headless=True,
+                                  settings=make_settings(overrides or {}))
+        self.settings = self.game.settings
+
+        # Slots for every bullet that can be in flight and every alien of a
+        # standard fleet, each as (x, y, present).
+        self.bullet_slots = self.settings.bullets_allowed
+        self.alien_slots = len(self.game.fleet.template())
+        self.aliens_start = 1 + 3 * self.bullet_slots
+        self.base = None
+
+        self.steps = 0
+        self.last_score = 0
+
+
+    @property
+    def observation_shape(self):
+        """
+        Returns the shape of every observation.
+        """
+        if self.observation == "vector":
+            return (1 + 3 * (self.bullet_slots + self.alien_slots),)
+        shape = frame_shape(self.game.screen.get_size(), self.pixel_scale)
+        return shape if self.grayscale else shape + (3,)
+
+
+    def reset(self):
+        """
+        Starts a new game, and returns its first observation and info.
+        """
+        self.game.state.enter(GamePhase.MENU)
+        self.game._start_game()
+        self.steps = 0
+        self.last_score = 0
+        return self._observe(), self._info()
+
+
+    def step(self, action):
+        """
+        Plays action, and returns the observation, the reward, whether the
+        game ended, whether the episode was cut short, and info.
+        """
+        game = self.game
+        game.ship.moving_left = bool(action & LEFT)
+        game.ship.moving_right = bool(action & RIGHT)
+
+        for _ in range(self.frame_skip):
+            if action & SPACE:
+                game._fire_bullet()
+            game._step()
+            if not game.game_active:
+                break
+        self.steps += 1
+
+        score = game.stats.score
+        reward = score - self.last_score
+        self.last_score = score
+
+        terminated = not game.game_active
+        truncated = (not terminated and self.max_steps is not None
+                     and self.steps >= self.max_steps)
+        return self._observe(), reward, terminated, truncated, self._info()
+
+
+    def close(self):
+        """
+        Stops the game's background writer.
+        """
+        self.game.score_store.close()
+
+
+    def _info(self):
+        """
+        Returns the game's statistics.
+        """
+        stats = self.game.stats
+        return {"score": stats.score,
+                "level": stats.level,
+                "ships_left": stats.ships_left}
+
+
+    def _observe(self):
+        """
+        Returns the observation for the game's current state.
+        """
+        if self.observation == "vector":
+            return self._vector()
+        return self._pixels()
+
+
+    def _vector(self):
+        """
+        Returns the ship, bullet and alien positions as fractions of the
+        screen size. Each x is the center of a sprite, and each y its top.
+        """
+        game = self.game
+        width = self.settings.screen_width
+        height = self.settings.screen_height
+
+        # Starts from the fleet's spawn positions, then shifts the aliens by
+        # the fleet's offset, since the alien sprites are only moved into
+        # place when they are drawn.
+        fleet = game.fleet
+        observation = self._base(fleet).copy()
+        aliens = observation[self.aliens_start:].reshape(-1, 3)
+        count = min(len(fleet.alive), self.alien_slots)
+        aliens[:count, 0] += fleet.offset_x / width
+        aliens[:count, 1] += fleet.offset_y / height
+        aliens[:count, 2] = fleet.alive[:count]
+
+        observation[0] = (game.ship.x + game.ship.rect.width / 2) / width
+        i = 1
+        for bullet in game.bullets.sprites()[:self.bullet_slots]:
+            observation[i:i + 3] = (bullet.rect.centerx / width,
+                                    bullet.y / height, 1.0)
+            i += 3
+        return observation
+
+
+    def _base(self, fleet):
+        """
+        Returns a vector observation holding only the fleet's spawn
+        positions.
+
+        A fleet's positions are shared with its template, so this is only
+        rebuilt when the layout changes.
+        """
+        if self.base is None or self.base[0] is not fleet.home_x:
+            observation = np.zeros(self.observation_shape, dtype=np.float32)
+            aliens = observation[self.aliens_start:].reshape(-1, 3)
+            count = min(len(fleet.home_x), self.alien_slots)
+            aliens[:count, 0] = (np.array(fleet.home_x[:count])
+                                 + fleet.alien_width / 2) \
+                / self.settings.screen_width
+            aliens[:count, 1] = np.array(fleet.home_y[:count]) \
+                / self.settings.screen_height
+            self.base = (fleet.home_x, observation)
+        return self.base[1]
+
+
+    def _pixels(self):
+        """
+        Draws the game and returns a downsampled frame as a (height, width)
+        or (height, width, 3) array.
+        """
+        game = self.game
+        game.stats.flush()
+        game.renderer.render()
+
+        # The view is let go straight away, since it locks the screen
+        # against drawing.
+        offsets = channel_offsets(game.screen)
+        pixels = pixels_view(game.screen)
+        frame = downsample(pixels, offsets, self.pixel_scale, self.grayscale)
+        del pixels
+        return frame if self.grayscale else rgb_view(frame, offsets)
+
+
+class VectorEnv:
+    """
+    A class to step several environments in lockstep in one process.
+
+    An environment whose episode ends is reset straight away. The last
+    observation of the finished episode is kept in its info as
+    "final_observation".
+    """
+    def __init__(self, num_envs, **kwargs):
+        """
+        Creates num_envs environments, each with kwargs.
+        """
+        self.envs = [AlienInvasionEnv(**kwargs) for _ in range(num_envs)]
+
+
+    def __len__(self):
+        """
+        Returns the number of environments.
+        """
+        return len(self.envs)
+
+
+    def reset(self):
+        """
+        Resets every environment, and returns their stacked observations
+        and a list of their infos.
+        """
+        observations, infos = zip(*(env.reset() for env in self.envs))
+        return np.stack(observations), list(infos)
+
+
+    def step(self, actions):
+        """
+        Plays one action in each environment, and returns stacked
+        observations, rewards, terminated and truncated flags, and a list
+        of infos.
+        """
+        observations = []
+        rewards = np.zeros(len(self.envs), dtype=np.float32)
+        terminated = np.zeros(len(self.envs), dtype=bool)
+        truncated = np.zeros(len(self.envs), dtype=bool)
+        infos = []
+
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, rewards[i], terminated[i], truncated[i], info = \
+                env.step(int(action))
+            if terminated[i] or truncated[i]:
+                info["final_observation"] = observation
+                observation, _ = env.reset()
+            observations.append(observation)
+            infos.append(info)
+        return np.stack(observations), rewards, terminated, truncated, infos
+
+
+    def close(self):
+        """
+        Closes every environment.
+        """
+        for env in self.envs:
+            env.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=10000,
+                        help="steps per environment")
+    parser.add_argument("--observation", choices=AlienInvasionEnv.observations,
+                        default="vector")
+    parser.add_argument("--pixel-scale", type=int, default=4)
+    parser.add_argument("--grayscale", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    envs = VectorEnv(args.envs, observation=args.observation,
+                     pixel_scale=args.pixel_scale, grayscale=args.grayscale)
+    envs.reset()
+    rng = random.Random(args.seed)
+
+    start = perf_counter()
+    for _ in range(args.steps):
+        envs.step([rng.randrange(ACTIONS) for _ in range(len(envs))])
+    elapsed = perf_counter() - start
+    envs.close()
+
+    steps = args.steps * len(envs)
+    print(f"{steps} steps in {elapsed:.2f} s ({steps / elapsed:.0f} steps/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
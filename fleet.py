@@ -0,0 +1,518 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from pygame.sprite import Group
+
+from alien import Alien
+from collision import SpatialHash
+from pool import SpritePool
+
+
+class FleetTemplate:
+    """
+    A class to hold everything about a fleet layout that never changes.
+
+    Templates are built once per layout. Spawning a fleet from one only
+    copies the few pieces that a fleet changes as aliens die.
+    """
+    def __init__(self, fleet, positions):
+        """
+        Sorts positions into grid columns and rows, and builds the spatial
+        hash and composited image for a full fleet.
+        """
+        self.home_x = [float(x) for x, _ in positions]
+        self.home_y = [float(y) for _, y in positions]
+
+        # Sorts the aliens into the columns and rows of the grid.
+        self.column_x = sorted(set(self.home_x))
+        self.row_y = sorted(set(self.home_y))
+        column_of = {x: i for i, x in enumerate(self.column_x)}
+        row_of = {y: i for i, y in enumerate(self.row_y)}
+        self.columns = [column_of[x] for x in self.home_x]
+        self.rows = [row_of[y] for y in self.home_y]
+
+        self.column_counts = [0] * len(self.column_x)
+        self.row_counts = [0] * len(self.row_y)
+        for column, row in zip(self.columns, self.rows):
+            self.column_counts[column] += 1
+            self.row_counts[row] += 1
+
+        # Aliens are spaced one alien apart, so a cell of two aliens holds
+        # about one of them.
+        self.grid = SpatialHash(2 * fleet.alien_width, 2 * fleet.alien_height)
+        for i, (x, y) in enumerate(zip(self.home_x, self.home_y)):
+            self.grid.insert(i, x, y,
+                             x + fleet.alien_width, y + fleet.alien_height)
+
+        self.image = None
+        if fleet.settings.composite_fleet and positions:
+            self.image = self._build_image(fleet)
+
+
+    def __len__(self):
+        """
+        Returns the number of aliens in the layout.
+        """
+        return len(self.home_x)
+
+
+    def _build_image(self, fleet):
+        """
+        Draws the whole fleet once onto a colorkeyed image.
+        """
+        self.image_left = self.column_x[0]
+        self.image_top = self.row_y[0]
+        width = self.column_x[-1] - self.image_left + fleet.alien_width
+        height = self.row_y[-1] - self.image_top + fleet.alien_height
+
+        image = pygame.Surface((int(width), int(height))).convert()
+        image.fill(fleet.colorkey)
+        image.set_colorkey(fleet.colorkey)
+        image.blits([(fleet.alien_image,
+                      (x - self.image_left, y - self.image_top))
+                     for x, y in zip(self.home_x, self.home_y)],
+                    doreturn=False)
+        return image
+
+
+class SpareFleet:
+    """
+    A class to hold the next fleet while it is being prepared.
+    """
+    def __init__(self, template):
+        """
+        Starts preparing a fleet from template.
+        """
+        self.template = template
+        self.sprites = []
+        self.aliens = Group()
+        self.cells = None
+        self.images = None
+
+
+    def prepare(self, pool, budget):
+        """
+        Does up to budget sprites' worth of work, and returns True once
+        the fleet is ready to spawn.
+        """
+        missing = len(self.template) - len(self.sprites)
+        if missing:
+            sprites = [pool.acquire() for _ in range(min(missing, budget))]
+            self.sprites.extend(sprites)
+            self.aliens.add(sprites)
+        elif self.cells is None:
+            self.cells = {key: set(cell)
+                          for key, cell in self.template.grid.cells.items()}
+        elif self.images is None:
+            image = self.template.image
+            self.images = [image.copy(), image.copy()] if image else []
+        else:
+            return True
+        return False
+
+
+    def release(self, pool):
+        """
+        Returns the sprites acquired so far to pool.
+        """
+        for sprite in self.sprites:
+            pool.release(sprite)
+        self.sprites = []
+
+
+class Fleet:
+    """
+    A class to move and test the whole alien fleet as one rigid body.
+
+    Every alien keeps its spawn position in the fleet's own frame, and the
+    fleet as a whole keeps a single offset, so moving and dropping the
+    fleet never touches individual aliens. An occupancy grid of columns
+    and rows gives the fleet's edges without looping over the aliens.
+
+    Collisions go through a spatial hash in the fleet's frame: queries are
+    shifted by the offset, and only a killed alien changes the hash. Rects
+    the hash finds overlapping are then checked pixel by pixel against the
+    alien image's shared mask.
+
+    Each layout is worked out once and kept as a FleetTemplate. While a
+    level is played, the next fleet is prepared from it a few sprites per
+    logic step, so spawning a fleet is little more than a swap.
+    """
+    # Fills the empty parts of the composited fleet image.
+    colorkey = (255, 0, 255)
+
+    def __init__(self, ai_game):
+        """
+        Initializes an empty fleet.
+        """
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+        self.aliens = ai_game.aliens
+
+        # The size of a single alien, taken from its image.
+        self.alien_image = ai_game.assets.load_image("images/alien.bmp")
+        self.alien_width, self.alien_height = self.alien_image.get_size()
+        self.alien_mask = ai_game.assets.load_mask("images/alien.bmp")
+        self.assets = ai_game.assets
+
+        # Aliens are spaced one alien apart, so a cell of two aliens holds
+        # about one of them.
+        self.grid = SpatialHash(2 * self.alien_width, 2 * self.alien_height)
+
+        # Reuses Alien sprites from one fleet to the next.
+        self.pool = SpritePool(lambda: Alien(ai_game))
+        self.sprites = []
+
+        # Recently used templates by layout, and the next fleet being
+        # prepared.
+        self.templates = OrderedDict()
+        self.spare = None
+
+        self.empty()
+
+
+    def empty(self):
+        """
+        Removes every alien from the fleet.
+        """
+        for sprite in self.aliens.sprites():
+            self.pool.release(sprite)
+
+        # Each alien's spawn position, grid column and grid row, and the
+        # x of every grid column and the y of every grid row. These are
+        # shared with the fleet's template and never change.
+        self.home_x = []
+        self.home_y = []
+        self.columns = []
+        self.rows = []
+        self.column_x = []
+        self.row_y = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.sprites = []
+
+        # How many aliens are still alive in each column and row.
+        self.column_counts = []
+        self.row_counts = []
+
+        # The outermost columns and the lowest row that still have aliens.
+        self.first_column = 0
+        self.last_column = -1
+        self.last_row = -1
+
+        # Distance the fleet has moved since it spawned, and before the
+        # last logic step.
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.prev_offset = (0.0, 0.0)
+        self.grid.clear()
+
+        self.images = []
+        self.image_changed = False
+
+
+    def layout(self):
+        """
+        Returns the alien positions of a standard fleet for this screen.
+        """
+        # Keeps adding alien positions until there's no room left.
+        # Spacing between aliens is one alien width and one alien height.
+        alien_width, alien_height = self.alien_width, self.alien_height
+        positions = []
+
+        current_x, current_y = alien_width, alien_height
+        while current_y < (self.settings.screen_height - 3 * alien_height):
+            while current_x < (self.settings.screen_width - 2 * alien_width):
+                positions.append((current_x, current_y))
+                current_x += 2 * alien_width
+
+            # Finished a row: resets x value and increments y value.
+            current_x = alien_width
+            current_y += 2 * alien_height
+        return tuple(positions)
+
+
+    def template(self, positions=None):
+        """
+        Returns the template for positions, or for the standard layout.
+        """
+        key = (tuple(positions) if positions is not None else None,
+               self.settings.screen_width, self.settings.screen_height)
+        template = self.templates.get(key)
+        if template is not None:
+            self.templates.move_to_end(key)
+            return template
+
+        template = FleetTemplate(self, positions if positions is not None
+                                 else self.layout())
+        self.templates[key] = template
+        if len(self.templates) > self.settings.fleet_template_cache:
+            self.templates.popitem(last=False)
+
+        # Leaves room in the pool for a live fleet and a spare one.
+        self.pool.reserve(2 * len(template))
+        return template
+
+
+    def _spare_for(self, template):
+        """
+        Returns the spare fleet for template, starting a new one if the
+        spare was for another template. The old spare's sprites go back
+        to the pool.
+        """
+        if self.spare is None or self.spare.template is not template:
+            if self.spare is not None:
+                self.spare.release(self.pool)
+            self.spare = SpareFleet(template)
+        return self.spare
+
+
+    def prewarm(self):
+        """
+        Prepares part of the next standard fleet.
+
+        Called once per logic step while a level is played, so the work is
+        spread over fleet_prewarm_batch sprites per step.
+        """
+        spare = self._spare_for(self.template())
+        spare.prepare(self.pool, self.settings.fleet_prewarm_batch)
+
+
+    def spawn(self, positions=None):
+        """
+        Replaces the fleet with one alien at each (x, y) in positions, or
+        with a standard fleet if positions is None.
+        """
+        self.empty()
+        template = self.template(positions)
+
+        # Finishes whatever preparation the prewarm didn't get to.
+        spare = self._spare_for(template)
+        while not spare.prepare(self.pool, len(template)):
+            pass
+        self.spare = None
+
+        self.home_x, self.home_y = template.home_x, template.home_y
+        self.columns, self.rows = template.columns, template.rows
+        self.column_x, self.row_y = template.column_x, template.row_y
+        self.column_counts = list(template.column_counts)
+        self.row_counts = list(template.row_counts)
+        self.first_column = 0
+        self.last_column = len(self.column_x) - 1
+        self.last_row = len(self.row_y) - 1
+        self.alive = np.ones(len(template), dtype=bool)
+
+        self.grid.cells = spare.cells
+        self.images = spare.images
+        if self.images:
+            self.image_left = template.image_left
+            self.image_top = template.image_top
+
+        # The spare's group becomes the game's aliens group. Sprites are
+        # moved into place when they are drawn.
+        self.sprites = spare.sprites
+        self.aliens = self.ai_game.aliens = spare.aliens
+
+
+    def __len__(self):
+        """
+        Returns the number of aliens still alive.
+        """
+        return len(self.aliens)
+
+
+    def check_edges(self):
+        """
+        Returns True if any living alien is at the edge of the screen.
+        """
+        if not self.aliens:
+            return False
+        left = self.column_x[self.first_column] + self.offset_x
+        right = (self.column_x[self.last_column] + self.alien_width
+                 + self.offset_x)
+        return right >= self.screen_rect.right or left <= 0
+
+
+    def change_direction(self):
+        """
+        Drops the entire fleet and changes the fleet's direction.
+        """
+        self.offset_y += self.settings.fleet_drop_speed
+        self.settings.fleet_direction *= -1
+
+
+    def save_position(self):
+        """
+        Remembers the fleet's offset before a logic step.
+        """
+        self.prev_offset = (self.offset_x, self.offset_y)
+
+
+    def update(self, dt):
+        """
+        Moves the entire fleet sideways for dt seconds.
+        """
+        self.offset_x += (self.settings.alien_speed
+                          * self.settings.fleet_direction * dt)
+
+
+    def reached_bottom(self):
+        """
+        Returns True if any living alien has reached the bottom of the screen.
+        """
+        if not self.aliens:
+            return False
+        bottom = self.row_y[self.last_row] + self.alien_height + self.offset_y
+        return bottom >= self.screen_rect.bottom
+
+
+    def _box(self, i):
+        """
+        Returns the (left, top, right, bottom) box of alien i in the
+        fleet's frame.
+        """
+        x, y = self.home_x[i], self.home_y[i]
+        return x, y, x + self.alien_width, y + self.alien_height
+
+
+    def collide_rect(self, rect, mask=None):
+        """
+        Returns the indices of the living aliens that overlap rect.
+
+        If mask is given, it is the mask of what is drawn in rect, and only
+        aliens that share a drawn pixel with it count.
+        """
+        # Shifts rect into the fleet's frame.
+        left = rect.left - self.offset_x
+        top = rect.top - self.offset_y
+        right = rect.right - self.offset_x
+        bottom = rect.bottom - self.offset_y
+
+        # Broad phase through the hash, then exact overlap.
+        hits = []
+        for i in sorted(self.grid.query(left, top, right, bottom)):
+            x, y = self.home_x[i], self.home_y[i]
+            if (x < right and x + self.alien_width > left
+                    and y < bottom and y + self.alien_height > top):
+                hits.append(i)
+
+        # Narrow phase against the shared mask, with each alien where it
+        # is drawn.
+        if hits and mask is not None and self.settings.mask_collisions:
+            hits = [i for i in hits if self.alien_mask.overlap(
+                mask, (rect.left - int(self.home_x[i] + self.offset_x),
+                       rect.top - int(self.home_y[i] + self.offset_y)))]
+        return hits
+
+
+    def collides_with(self, rect, mask=None):
+        """
+        Returns True if any living alien overlaps rect, or mask in rect.
+        """
+        return len(self.collide_rect(rect, mask)) > 0
+
+
+    def collide_bullets(self, bullets):
+        """
+        Finds bullets that hit aliens and removes those aliens.
+
+        Returns a dictionary mapping each bullet that hit something to the
+        list of aliens it destroyed.
+        """
+        collisions = {}
+        for bullet in bullets.sprites():
+            # Bullets fill their rects.
+            hits = self.collide_rect(bullet.rect,
+                                     self.assets.full_mask(bullet.rect.size))
+            if len(hits):
+                collisions[bullet] = self.kill(hits)
+        return collisions
+
+
+    def kill(self, indices):
+        """
+        Removes the aliens at indices and returns their sprites.
+        """
+        self.alive[indices] = False
+        for i in indices:
+            self.grid.remove(i, *self._box(i))
+            self.column_counts[self.columns[i]] -= 1
+            self.row_counts[self.rows[i]] -= 1
+            self._erase_image(i)
+
+        # Moves the fleet's edges inward past any columns or rows that
+        # just emptied. Edges only ever move inward, so this is O(1)
+        # amortized over the life of the fleet.
+        while (self.first_column <= self.last_column
+                and not self.column_counts[self.first_column]):
+            self.first_column += 1
+        while (self.last_column >= self.first_column
+                and not self.column_counts[self.last_column]):
+            self.last_column -= 1
+        while self.last_row >= 0 and not self.row_counts[self.last_row]:
+            self.last_row -= 1
+
+        killed = [self.sprites[i] for i in indices]
+        for sprite in killed:
+            self.pool.release(sprite)
+        return killed
+
+
+    def _draw_offset(self, alpha):
+        """
+        Returns the fleet's offset alpha of the way between its last two
+        positions.
+        """
+        back = 1 - alpha
+        return (self.offset_x + (self.prev_offset[0] - self.offset_x) * back,
+                self.offset_y + (self.prev_offset[1] - self.offset_y) * back)
+
+
+    def sync_sprites(self, alpha=1.0):
+        """
+        Moves the living sprites to the fleet's position for drawing.
+        """
+        offset_x, offset_y = self._draw_offset(alpha)
+        for i in np.flatnonzero(self.alive).tolist():
+            self.sprites[i].rect.topleft = (int(self.home_x[i] + offset_x),
+                                            int(self.home_y[i] + offset_y))
+
+
+    def _erase_image(self, i):
+        """
+        Erases alien i from the composited images.
+        """
+        if not self.images:
+            return
+        cell = pygame.Rect(int(self.home_x[i] - self.image_left),
+                           int(self.home_y[i] - self.image_top),
+                           self.alien_width, self.alien_height)
+        for image in self.images:
+            image.fill(self.colorkey, cell)
+        self.image_changed = True
+
+
+    def draw_items(self, alpha=1.0):
+        """
+        Returns the fleet as (image, rect) pairs to draw.
+
+        That's a single composited image when composite_fleet is on, and
+        one pair per living alien otherwise.
+        """
+        if not self.aliens:
+            return []
+
+        if not self.images:
+            self.sync_sprites(alpha)
+            return [(alien.image, alien.rect)
+                    for alien in self.aliens.sprites()]
+
+        if self.image_changed:
+            self.images.reverse()
+            self.image_changed = False
+        offset_x, offset_y = self._draw_offset(alpha)
+        image = self.images[0]
+        rect = image.get_rect(topleft=(int(self.image_left + offset_x),
+                                       int(self.image_top + offset_y)))
+        return [(image, rect)]
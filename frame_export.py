@@ -0,0 +1,285 @@
+"""
+Publishes rendered frames into shared memory for other processes to read.
+
+The game copies each frame, downsampled and optionally grayscale, into a
+ring of slots in a multiprocessing.shared_memory block. Readers map the same
+block and see every slot as a NumPy array, so frames are never pickled or
+copied on their way out.
+
+    python alien_invasion.py --export-frames alien_frames
+    python frame_export.py alien_frames
+"""
+import argparse
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from time import perf_counter, sleep
+
+import numpy as np
+
+
+# Integer weights, out of 256, that turn RGB into luminance.
+GRAY = (77, 150, 29)
+
+# The block starts with a header describing the frames, padded to
+# HEADER_SIZE bytes. Then come the number of frames published so far and
+# the frame number held by each slot, as uint64s, and then the slots.
+MAGIC = b"AIFX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHHBBB")
+HEADER_SIZE = 64
+
+
+def pixels_view(surface):
+    """
+    Returns surface's 32-bit pixels as a (height, width) uint32 view, not a
+    copy.
+
+    The surface stays locked against drawing until the view is deleted.
+    """
+    width, height = surface.get_size()
+    pixels = np.frombuffer(surface.get_buffer(), dtype=np.uint32)
+    return pixels.reshape(height, -1)[:, :width]
+
+
+def channel_offsets(surface):
+    """
+    Returns the byte offsets of red, green and blue within one of
+    surface's pixels.
+    """
+    offsets = [shift // 8 for shift in surface.get_shifts()[:3]]
+    if sys.byteorder == "big":
+        offsets = [3 - offset for offset in offsets]
+    return tuple(offsets)
+
+
+def rgb_view(pixels, offsets):
+    """
+    Returns (..., 3) RGB channels of 32-bit pixels, as a view if the
+    channels are stored in order or in reverse.
+
+    pixels must be contiguous along its rows.
+    """
+    channels = pixels.view(np.uint8).reshape(pixels.shape + (4,))
+    red, green, blue = offsets
+    step = green - red
+    if abs(step) == 1 and blue - green == step:
+        stop = red + 3 * step
+        return channels[..., red:stop if stop >= 0 else None:step]
+    return channels[..., list(offsets)]
+
+
+def downsample(pixels, offsets, scale=1, grayscale=False, out=None):
+    """
+    Keeps every scale-th pixel of each row and column of 32-bit pixels,
+    optionally turning them into 8-bit grayscale.
+
+    pixels must be contiguous along its rows. Striding is done on a view,
+    so only the kept pixels are copied: into out if it is given, or into a
+    new array. Color frames stay as 32-bit pixels, which copy far faster
+    than separate channels; rgb_view() reads them as RGB.
+    """
+    if grayscale:
+        channels = pixels.view(np.uint8).reshape(pixels.shape + (4,))
+        channels = channels[::scale, ::scale]
+        gray = sum(channels[..., offset].astype(np.uint16) * weight
+                   for offset, weight in zip(offsets, GRAY))
+        frame = (gray >> 8).astype(np.uint8)
+    else:
+        frame = pixels[::scale, ::scale]
+    if out is None:
+        return np.ascontiguousarray(frame)
+    out[...] = frame
+    return out
+
+
+def frame_shape(size, scale=1):
+    """
+    Returns the (height, width) of a frame of a (width, height) surface
+    once downsampled.
+    """
+    return -(-size[1] // scale), -(-size[0] // scale)
+
+
+def _map(buffer, shape, dtype, slots):
+    """
+    Returns the published count, the slot frame numbers and the slots of a
+    block as arrays over buffer.
+    """
+    counters = np.ndarray((1 + slots,), dtype=np.uint64, buffer=buffer,
+                          offset=HEADER_SIZE)
+    pixels = np.ndarray((slots,) + shape, dtype=dtype, buffer=buffer,
+                        offset=HEADER_SIZE + counters.nbytes)
+    return counters[:1], counters[1:], pixels
+
+
+class FrameExporter:
+    """
+    A class to publish every drawn frame into a shared memory ring.
+
+    A slot's frame number is cleared while it is being written and set once
+    it is complete, so readers can tell when a frame they hold was
+    overwritten.
+    """
+    def __init__(self, ai_game):
+        """
+        Creates the shared memory block named by the frame_export setting.
+        """
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.scale = self.settings.frame_export_scale
+        self.grayscale = self.settings.frame_export_grayscale
+        self.slots = self.settings.frame_export_slots
+
+        self.offsets = channel_offsets(self.screen)
+        shape = frame_shape(self.screen.get_size(), self.scale)
+        dtype = np.uint8 if self.grayscale else np.uint32
+        size = (HEADER_SIZE + 8 * (1 + self.slots)
+                + self.slots * int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.memory = shared_memory.SharedMemory(
+            self.settings.frame_export, create=True, size=size)
+        HEADER.pack_into(self.memory.buf, 0, MAGIC, VERSION, shape[1],
+                         shape[0], 1 if self.grayscale else 4, self.slots,
+                         *self.offsets)
+        self.published, self.frame_numbers, self.pixels = _map(
+            self.memory.buf, shape, dtype, self.slots)
+
+
+    def publish(self):
+        """
+        Copies the screen into the next slot.
+        """
+        count = int(self.published[0])
+        index = count % self.slots
+        self.frame_numbers[index] = 0
+
+        pixels = pixels_view(self.screen)
+        downsample(pixels, self.offsets, self.scale, self.grayscale,
+                   self.pixels[index])
+        del pixels
+
+        self.frame_numbers[index] = count + 1
+        self.published[0] = count + 1
+
+
+    def close(self):
+        """
+        Removes the shared memory block.
+        """
+        # The arrays must let go of the block before it can be closed.
+        del self.published, self.frame_numbers, self.pixels
+        self.memory.close()
+        self.memory.unlink()
+
+
+class FrameReader:
+    """
+    A class to read frames published by a FrameExporter in another process.
+    """
+    def __init__(self, name):
+        """
+        Maps the shared memory block called name.
+        """
+        self.memory = shared_memory.SharedMemory(name)
+
+        # Only the exporter should remove the block, but Python's resource
+        # tracker would remove it when this process exits.
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+
+        magic, version, width, height, channels, self.slots, *offsets = \
+            HEADER.unpack_from(self.memory.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} does not hold exported frames")
+        dtype = np.uint8 if channels == 1 else np.uint32
+        self.published, self.frame_numbers, self.pixels = _map(
+            self.memory.buf, (height, width), dtype, self.slots)
+
+        # Color frames are read as RGB straight from the 32-bit pixels.
+        if channels != 1:
+            self.pixels = rgb_view(self.pixels, offsets)
+
+
+    def latest(self):
+        """
+        Returns the newest frame number and a view of its pixels, or
+        (0, None) if nothing was published yet.
+
+        Pixels are (height, width) for grayscale frames and
+        (height, width, 3) RGB otherwise.
+        """
+        number = int(self.published[0])
+        if not number:
+            return 0, None
+        return number, self.pixels[(number - 1) % self.slots]
+
+
+    def is_current(self, number):
+        """
+        Returns True if frame number is still in its slot, untouched.
+        """
+        return int(self.frame_numbers[(number - 1) % self.slots]) == number
+
+
+    def frames(self, poll=0.001):
+        """
+        Yields (frame number, pixels view) for every frame published from
+        now on, skipping ahead past any that were already overwritten.
+
+        A view is only good until the exporter wraps around to its slot, so
+        check is_current() after using one if that matters.
+        """
+        wanted = int(self.published[0]) + 1
+        while True:
+            published = int(self.published[0])
+            if published < wanted:
+                sleep(poll)
+                continue
+
+            wanted = max(wanted, published - self.slots + 2)
+            yield wanted, self.pixels[(wanted - 1) % self.slots]
+            wanted += 1
+
+
+    def close(self):
+        """
+        Unmaps the shared memory block.
+        """
+        del self.published, self.frame_numbers, self.pixels
+        self.memory.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("name", help="shared memory name given to the game")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    reader = FrameReader(args.name)
+    received = dropped = torn = 0
+    last = 0
+    start = perf_counter()
+    while perf_counter() - start < args.seconds:
+        number, pixels = reader.latest()
+        if number == last:
+            sleep(0.001)
+            continue
+
+        # Stands in for real work on the frame.
+        pixels.mean()
+        del pixels
+        if not reader.is_current(number):
+            torn += 1
+        received += 1
+        dropped += max(0, number - last - 1) if last else 0
+        last = number
+    elapsed = perf_counter() - start
+
+    print(f"{received} frames in {elapsed:.1f} s "
+          f"({received / elapsed:.1f} frames/s), {dropped} skipped, "
+          f"{torn} overwritten while read")
+    reader.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+from enum import Enum
+
+
+class GamePhase(Enum):
+    """
+    The phases a game of Alien Invasion moves through.
+    """
+    MENU = "menu"
+    PLAYING = "playing"
+    RESPAWN = "respawn"
+    GAME_OVER = "game_over"
+
+
+class GameState:
+    """
+    A class to track the current phase and run its timed transitions.
+
+    Timers run on game time passed in by each logic step rather than wall
+    time, so a pause never blocks the event loop and headless runs stay
+    deterministic.
+    """
+    # The phase each timed phase moves on to once its timer runs out.
+    next_phases = {GamePhase.RESPAWN: GamePhase.PLAYING,
+                   GamePhase.GAME_OVER: GamePhase.MENU}
+
+    def __init__(self, ai_game):
+        """
+        Starts in the menu.
+        """
+        self.phase = GamePhase.MENU
+        self.time_left = 0.0
+
+
+    def enter(self, phase, seconds=0):
+        """
+        Switches to phase, leaving it again after the given seconds.
+        """
+        self.phase = phase
+        self.time_left = seconds
+
+
+    def update(self, dt):
+        """
+        Counts down the current phase's timer by dt seconds.
+
+        Returns the phase that was entered if the timer ran out, or None.
+        """
+        if self.phase not in self.next_phases:
+            return None
+
+        # Allows for rounding when the timer is counted down in steps.
+        if self.time_left > 1e-9:
+            self.time_left -= dt
+            return None
+
+        self.phase = self.next_phases[self.phase]
+        return self.phase
+
+
+    @property
+    def game_active(self):
+        """
+        Returns True while a game is in progress, pauses included.
+        """
+        return self.phase in (GamePhase.PLAYING, GamePhase.RESPAWN)
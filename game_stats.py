@@ -1,24 +1,53 @@
-from pathlib import Path
+def _observed(name):
+    """
+    Returns a property for name that records every change for flush().
+    """
+    def get(self):
+        return self._values[name]
+
+    def set(self, value):
+        self._values[name] = value
+        self._changed.add(name)
+
+    return property(get, set)
 
 
 class GameStats:
+    """
+    A class to track statistics for Alien Invasion.
+
+    Changes to the statistics are collected rather than acted on at once.
+    flush() tells listeners, once, which values really changed since the
+    last flush, so the scoreboard redraws each item at most once a frame.
+    """
+    score = _observed("score")
+    level = _observed("level")
+    ships_left = _observed("ships_left")
+    high_score = _observed("high_score")
+
     def __init__(self, ai_game):
         """
         Initializes statistics.
         """
         self.settings = ai_game.settings
+        self.score_store = ai_game.score_store
+
+        self._values = {}
+        self._changed = set()
+        self._published = {}
+        self.listeners = []
+
         self.reset_stats()
 
         # High scores should never be reset.
         self.high_score = self._obtain_high_score()
 
-    
+
     def _obtain_high_score(self):
         """
         Obtains the current high score.
         """
-        score_path = Path("high_score.txt")
-        return int(score_path.read_text().rstrip())
+        return self.score_store.load_high_score()
 
 
     def reset_stats(self):
@@ -27,4 +56,38 @@ class GameStats:
         """
         self.ships_left = self.settings.ship_limit
         self.score = 0
-        self.level = 1
\ No newline at end of file
+        self.level = 1
+
+
+    def add_score(self, points):
+        """
+        Adds points to the score, raising the high score to match.
+        """
+        self.score += points
+        if self.score > self.high_score:
+            self.high_score = self.score
+
+
+    def add_listener(self, listener):
+        """
+        Calls listener with the set of changed names on every flush().
+        """
+        self.listeners.append(listener)
+
+
+    def flush(self):
+        """
+        Tells the listeners which statistics changed since the last flush.
+        """
+        if not self._changed:
+            return
+
+        changed = {name for name in self._changed
+                   if self._values[name] != self._published.get(name)}
+        self._changed.clear()
+        for name in changed:
+            self._published[name] = self._values[name]
+
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
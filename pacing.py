@@ -0,0 +1,117 @@
+import statistics
+from collections import deque
+from time import perf_counter, sleep
+
+import pygame
+
+from percentiles import percentile
+
+
+class FramePacer:
+    """
+    A class to hold the game to its target frame rate and measure jitter.
+
+    The pacing modes are:
+        "sleep": pygame's Clock.tick(), which sleeps with coarse granularity.
+        "busy": Clock.tick_busy_loop(), exact but spins a core while waiting.
+        "adaptive": sleeps, then shortens later sleeps by how far past
+            the deadline earlier ones overslept, without spinning.
+        "vsync": lets a vsync'd display flip do the waiting, or
+            Clock.tick() on frames that sent nothing to the display.
+        "uncapped": never waits.
+    """
+    modes = ("sleep", "busy", "adaptive", "vsync", "uncapped")
+
+    def __init__(self, ai_game):
+        """
+        Initializes the pacer and its frame time history.
+        """
+        self.settings = ai_game.settings
+        self.clock = ai_game.clock
+        self.mode = self.settings.pacing
+        if self.mode not in self.modes:
+            raise ValueError(f"unknown pacing mode: {self.mode}")
+
+        self.frame_times = deque(maxlen=self.settings.pacing_history)
+        self.last_tick = perf_counter()
+        self.oversleep = 0.0
+
+
+    def set_display_mode(self, size):
+        """
+        Creates the display with the configured flags and vsync setting.
+        """
+        flags = 0
+        for name in self.settings.display_flags:
+            flags |= getattr(pygame, name)
+
+        if self.mode == "vsync":
+            # SDL only honors vsync on a SCALED or OPENGL display.
+            try:
+                return pygame.display.set_mode(size, flags | pygame.SCALED,
+                                               vsync=1)
+            except pygame.error:
+                # No vsync here, so the adaptive limiter stands in for it.
+                self.mode = "adaptive"
+        return pygame.display.set_mode(size, flags)
+
+
+    def tick(self, presented=True):
+        """
+        Waits until the next frame is due, then returns the seconds since
+        the previous tick.
+
+        presented is whether the frame was sent to the display. In vsync
+        mode, a frame that wasn't had no flip to wait on.
+        """
+        target_fps = self.settings.target_fps
+        if self.mode == "sleep" or self.mode == "vsync" and not presented:
+            self.clock.tick(target_fps)
+        elif self.mode == "busy":
+            self.clock.tick_busy_loop(target_fps)
+        elif self.mode == "adaptive" and target_fps:
+            self._adaptive_wait(1 / target_fps)
+        else:
+            self.clock.tick()
+
+        now = perf_counter()
+        frame_time = now - self.last_tick
+        self.last_tick = now
+        self.frame_times.append(frame_time)
+        return frame_time
+
+
+    def _adaptive_wait(self, interval):
+        """
+        Sleeps until interval after the last tick, allowing for oversleep.
+        """
+        wake_at = self.last_tick + interval - self.oversleep
+        delay = wake_at - perf_counter()
+        if delay > 0:
+            sleep(delay)
+
+            # Keeps a running average of how late sleeps wake up.
+            late = perf_counter() - wake_at
+            self.oversleep = 0.9 * self.oversleep + 0.1 * max(0.0, late)
+        self.clock.tick()
+
+
+    def report(self):
+        """
+        Returns frame time statistics in milliseconds.
+        """
+        times = sorted(self.frame_times)
+        if len(times) < 2:
+            return {"mode": self.mode, "frames": len(times)}
+
+        target = 1000 / self.settings.target_fps if self.settings.target_fps \
+            else None
+        ms = [t * 1000 for t in times]
+        return {"mode": self.mode,
+                "frames": len(ms),
+                "target_ms": target,
+                "mean_ms": statistics.mean(ms),
+                "stdev_ms": statistics.stdev(ms),
+                "p50_ms": percentile(ms, 50),
+                "p99_ms": percentile(ms, 99),
+                "max_ms": ms[-1]}
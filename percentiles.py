@@ -0,0 +1,6 @@
+def percentile(ordered, percent):
+    """
+    Returns the value percent of the way through ordered, a sorted list
+    that isn't empty.
+    """
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
@@ -0,0 +1,41 @@
+class SpritePool:
+    """
+    A class to reuse sprites instead of allocating new ones.
+    """
+    def __init__(self, factory, capacity=0):
+        """
+        Initializes the pool and fills it with capacity sprites.
+
+        factory is called with no arguments to build a new sprite.
+        """
+        self.factory = factory
+        self.capacity = 0
+        self.free = []
+        self.reserve(capacity)
+
+
+    def reserve(self, capacity):
+        """
+        Grows the pool so it owns at least capacity sprites.
+        """
+        for _ in range(capacity - self.capacity):
+            self.free.append(self.factory())
+        self.capacity = max(self.capacity, capacity)
+
+
+    def acquire(self):
+        """
+        Returns a free sprite, building a new one only if the pool is empty.
+        """
+        if self.free:
+            return self.free.pop()
+        return self.factory()
+
+
+    def release(self, sprite):
+        """
+        Removes sprite from its groups and returns it to the pool.
+        """
+        sprite.kill()
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
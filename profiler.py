@@ -0,0 +1,180 @@
+import csv
+import json
+from array import array
+from time import perf_counter_ns
+
+import pygame
+
+from percentiles import percentile
+
+
+class NullProfiler:
+    """
+    A class with the profiler's interface that records nothing.
+    """
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def overlay_items(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FrameProfiler:
+    """
+    A class to time each phase of a frame into ring buffers.
+    """
+    enabled = True
+    phases = ("events", "ship", "bullets", "collisions", "aliens", "screen")
+
+    def __init__(self, ai_game):
+        """
+        Initializes a ring buffer of frame samples for every phase.
+        """
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.size = self.settings.profile_frames
+
+        self.samples = {phase: array("q", bytes(8 * self.size))
+                        for phase in self.phases + ("frame",)}
+        self.index = 0
+        self.count = 0
+        self.frame_start = self.last = perf_counter_ns()
+
+        # The overlay is re-rendered a few times a second, not every frame.
+        self.font = pygame.font.Font(None, 24)
+        self.overlay = []
+        self.overlay_age = 0
+
+
+    def begin_frame(self):
+        """
+        Starts timing a new frame.
+        """
+        self.frame_start = self.last = perf_counter_ns()
+        for phase in self.phases:
+            self.samples[phase][self.index] = 0
+
+
+    def lap(self, phase):
+        """
+        Adds the time since the last lap to the given phase.
+
+        Phases are added up, since a frame can run several logic steps.
+        """
+        now = perf_counter_ns()
+        self.samples[phase][self.index] += now - self.last
+        self.last = now
+
+
+    def end_frame(self):
+        """
+        Records the whole frame's time and moves to the next slot.
+        """
+        self.samples["frame"][self.index] = perf_counter_ns() - self.frame_start
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+
+    def _recent(self, phase):
+        """
+        Returns the recorded samples of phase, oldest first.
+        """
+        buffer = self.samples[phase]
+        if self.count < self.size:
+            return buffer[:self.count].tolist()
+        return buffer[self.index:].tolist() + buffer[:self.index].tolist()
+
+
+    def summary(self):
+        """
+        Returns FPS along with p50 and p99 milliseconds for every phase.
+        """
+        frames = self._recent("frame")
+        total = sum(frames)
+        result = {"fps": len(frames) * 1e9 / total if total else 0.0}
+        for phase in self.phases + ("frame",):
+            ordered = sorted(self._recent(phase))
+            if ordered:
+                p50 = percentile(ordered, 50)
+                p99 = percentile(ordered, 99)
+            else:
+                p50 = p99 = 0
+            result[phase] = {"p50_ms": p50 / 1e6, "p99_ms": p99 / 1e6}
+        return result
+
+
+    def overlay_items(self):
+        """
+        Returns the overlay's lines as (image, rect) pairs.
+        """
+        if not self.settings.profile_overlay:
+            return []
+
+        self.overlay_age -= 1
+        if self.overlay_age <= 0:
+            self.overlay = self._render_overlay()
+            self.overlay_age = self.settings.logic_fps // 4
+        return self.overlay
+
+
+    def _render_overlay(self):
+        """
+        Renders the current summary and sprite counts as lines of text.
+        """
+        summary = self.summary()
+        lines = [f"FPS {summary['fps']:.1f}  "
+                 f"bullets {len(self.ai_game.bullets)}  "
+                 f"aliens {len(self.ai_game.aliens)}"]
+        for phase in self.phases + ("frame",):
+            times = summary[phase]
+            lines.append(f"{phase:<10} p50 {times['p50_ms']:6.2f} ms  "
+                         f"p99 {times['p99_ms']:6.2f} ms")
+
+        items = []
+        top = 60
+        for line in lines:
+            image = self.font.render(line, True, (0, 0, 0),
+                                     self.settings.bg_color)
+            rect = image.get_rect(left=10, top=top)
+            items.append((image, rect))
+            top = rect.bottom + 2
+        return items
+
+
+    def export(self, path):
+        """
+        Writes the recorded samples to path, as JSON or CSV by extension.
+        """
+        columns = self.phases + ("frame",)
+        rows = list(zip(*(self._recent(phase) for phase in columns)))
+
+        if str(path).endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"unit": "ns",
+                           "summary": self.summary(),
+                           "columns": columns,
+                           "samples": rows}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
+
+
+    def close(self):
+        """
+        Exports the samples if an export path is set.
+        """
+        if self.settings.profile_export:
+            self.export(self.settings.profile_export)
@@ -0,0 +1,161 @@
+import pygame
+
+from game_state import GamePhase
+
+
+class FlipRenderer:
+    """
+    A class to redraw the whole screen and flip it on every frame.
+    """
+    def __init__(self, ai_game):
+        """
+        Initializes the renderer for the given game.
+        """
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # Whether the last draw() sent anything to the display.
+        self.presented = False
+
+
+    def draw_layers(self, alpha=1.0):
+        """
+        Returns what to draw this frame as layers of (image, rect) pairs,
+        from the bottom layer up: bullets, ships and aliens, then the HUD.
+
+        Moving things are drawn alpha of the way between their last two
+        positions when interpolation is switched on.
+        """
+        ai_game = self.ai_game
+        if not self.settings.interpolate_render:
+            alpha = 1.0
+
+        # The bullets all share one pre-filled image.
+        if alpha == 1.0:
+            bullets = [(bullet.image, bullet.rect)
+                       for bullet in ai_game.bullets.sprites()]
+        else:
+            bullets = [(bullet.image, bullet.draw_rect(alpha))
+                       for bullet in ai_game.bullets.sprites()]
+
+        # The Ship and the aliens.
+        sprites = [(ai_game.ship.image, ai_game.ship.draw_rect(alpha))]
+        sprites.extend(ai_game.fleet.draw_items(alpha))
+
+        # The score information.
+        hud = ai_game.sb.blit_items()
+
+        # The Play button while in the menu.
+        if ai_game.state.phase is GamePhase.MENU:
+            button = ai_game.play_button
+            hud.append((button.image, button.rect))
+            hud.append((button.msg_image, button.msg_image_rect))
+
+        # The profiler's overlay, if it is shown.
+        hud.extend(ai_game.profiler.overlay_items())
+
+        return bullets, sprites, hud
+
+
+    def _draw(self, layers):
+        """
+        Draws layers onto the screen with one batched blit per layer.
+        """
+        for layer in layers:
+            if layer:
+                self.screen.blits(layer, doreturn=False)
+
+
+    def render(self, alpha=1.0):
+        """
+        Redraws the whole screen without sending it to the display.
+        """
+        self.screen.fill(self.settings.bg_color)
+        self._draw(self.draw_layers(alpha))
+
+
+    def draw(self, alpha=1.0):
+        """
+        Redraws the screen and flips it to the display.
+        """
+        self.render(alpha)
+        pygame.display.flip()
+        self.presented = True
+
+
+    def invalidate(self):
+        """
+        Marks the whole screen as needing a redraw.
+        """
+
+
+class DirtyRenderer(FlipRenderer):
+    """
+    A class to push only the parts of the screen that changed.
+
+    Every frame, last frame's rects are painted over with a cached
+    background and everything is drawn again, but only the rects of items
+    that appeared, disappeared, moved or changed image are sent to the
+    display. An idle screen sends nothing at all.
+    """
+    def __init__(self, ai_game):
+        """
+        Initializes the renderer and its cached background.
+        """
+        super().__init__(ai_game)
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.background.fill(self.settings.bg_color)
+
+        self.last_items = set()
+        self.last_rects = []
+        self.invalidate()
+
+
+    def invalidate(self):
+        """
+        Marks the whole screen as needing a redraw.
+        """
+        self.full_redraw = True
+
+
+    def render(self, alpha=1.0):
+        """
+        Redraws the whole screen without sending it to the display.
+        """
+        super().render(alpha)
+
+        # The screen no longer matches the last drawn rects.
+        self.invalidate()
+
+
+    def draw(self, alpha=1.0):
+        """
+        Redraws what changed and updates only those rects on the display.
+        """
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            # Paints the background over last frame's items.
+            for rect in self.last_rects:
+                self.screen.blit(self.background, rect, rect)
+
+        layers = self.draw_layers(alpha)
+        self._draw(layers)
+
+        current = {(image, tuple(rect))
+                   for layer in layers for image, rect in layer}
+        changed = current ^ self.last_items
+        self.last_items = current
+        self.last_rects = [rect.copy() for layer in layers for _, rect in layer]
+
+        if self.full_redraw or len(changed) > self.settings.dirty_rect_limit:
+            # Too much changed for rects to pay off; flips instead.
+            pygame.display.flip()
+            self.full_redraw = False
+            self.presented = True
+        elif changed:
+            pygame.display.update([rect for _, rect in changed])
+            self.presented = True
+        else:
+            self.presented = False
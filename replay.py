@@ -0,0 +1,210 @@
+"""
+Records a game's input frame by frame and plays it back headless.
+
+    python alien_invasion.py --record session.rec
+    python replay.py session.rec --profile-export frames.csv
+"""
+import argparse
+import struct
+import sys
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+
+
+# Bits of a frame's input state. Left and right are held keys; space and
+# p are set on the frames they were pressed.
+LEFT = 1
+RIGHT = 2
+SPACE = 4
+PLAY = 8
+
+# A file starts with a magic string, a version and the logic rate, then
+# holds (repeat count, input state) runs. Since version 2, a run with a
+# count of 0 is one more press of space or p before the next step, so no
+# press is lost when several land between two steps.
+MAGIC = b"AIRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBH")
+RUN = struct.Struct("<HB")
+
+
+class InputRecorder:
+    """
+    A class to log a game's input state on every logic step.
+    """
+    def __init__(self, path, settings):
+        """
+        Initializes an empty recording to be saved to path.
+
+        Only fixed timestep games can be recorded, since a replay steps by
+        1 / logic_fps seconds.
+        """
+        if not settings.fixed_timestep:
+            raise ValueError("only fixed timestep games can be recorded")
+        self.path = path
+        self.logic_fps = settings.logic_fps
+        self.runs = []
+        self.presses = []
+
+
+    def key_pressed(self, key):
+        """
+        Notes a press of the space or p key during the current frame.
+        """
+        if key == pygame.K_SPACE:
+            self.presses.append(SPACE)
+        elif key == pygame.K_p:
+            self.presses.append(PLAY)
+
+
+    def end_frame(self, ai_game):
+        """
+        Logs the input state of the frame that is about to be stepped.
+        """
+        # Every press but the last gets a run of its own, without a step.
+        state = self.presses.pop() if self.presses else 0
+        for press in self.presses:
+            self.runs.append([0, press])
+        self.presses = []
+
+        if ai_game.ship.moving_left:
+            state |= LEFT
+        if ai_game.ship.moving_right:
+            state |= RIGHT
+
+        # Repeated states are stored as one run.
+        if self.runs and self.runs[-1][1] == state \
+                and 0 < self.runs[-1][0] < 0xFFFF:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, state])
+
+
+    def close(self):
+        """
+        Writes the recording to its file.
+        """
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.logic_fps))
+            for count, state in self.runs:
+                f.write(RUN.pack(count, state))
+
+
+def load_recording(path):
+    """
+    Returns the logic rate and the list of per-frame states in a recording.
+
+    Each state is a tuple of the extra presses made before the frame, as
+    SPACE or PLAY bits in order, and the frame's input state.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, logic_fps = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} is not an Alien Invasion recording")
+
+    states = []
+    presses = []
+    for count, state in RUN.iter_unpack(data[HEADER.size:]):
+        if not count:
+            presses.append(state)
+            continue
+        states.append((tuple(presses), state))
+        states.extend([((), state)] * (count - 1))
+        presses = []
+    return logic_fps, states
+
+
+class ReplayDriver:
+    """
+    A class to feed a recording back into a game, one logic step at a time.
+    """
+    def __init__(self, ai_game, states):
+        """
+        Initializes the driver for ai_game with the recorded states.
+        """
+        self.ai_game = ai_game
+        self.states = states
+        self.held = 0
+
+
+    def _apply(self, presses, state):
+        """
+        Sends the key events for presses, then those that turn the held
+        keys into state and press space or p as state says.
+        """
+        ai_game = self.ai_game
+        for press in presses:
+            self._press(press)
+
+        for bit, key in ((LEFT, pygame.K_LEFT), (RIGHT, pygame.K_RIGHT)):
+            if state & bit and not self.held & bit:
+                ai_game._check_keydown_events(
+                    pygame.event.Event(pygame.KEYDOWN, key=key))
+            elif self.held & bit and not state & bit:
+                ai_game._check_keyup_events(
+                    pygame.event.Event(pygame.KEYUP, key=key))
+        self.held = state & (LEFT | RIGHT)
+        self._press(state)
+
+
+    def _press(self, state):
+        """
+        Sends a press of space and of p, for each bit set in state.
+        """
+        for bit, key in ((SPACE, pygame.K_SPACE), (PLAY, pygame.K_p)):
+            if state & bit:
+                self.ai_game._check_keydown_events(
+                    pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
+    def run(self):
+        """
+        Steps the game through every recorded frame as fast as possible.
+        """
+        profiler = self.ai_game.profiler
+        for presses, state in self.states:
+            profiler.begin_frame()
+            self._apply(presses, state)
+            profiler.lap("events")
+            self.ai_game._step()
+            profiler.end_frame()
+        return len(self.states)
+
+
+def main(argv=None):
+    from alien_invasion import AlienInvasion
+
+    parser = argparse.ArgumentParser(description="Replays a recorded game.")
+    parser.add_argument("recording")
+    parser.add_argument("--profile-export", metavar="PATH",
+                        help="write per-phase frame times (.csv or .json)")
+    args = parser.parse_args(argv)
+
+    logic_fps, states = load_recording(args.recording)
+    settings = Settings()
+    settings.logic_fps = logic_fps
+    settings.high_score_file = settings.score_history_file = None
+    if args.profile_export:
+        settings.profile = True
+        settings.profile_frames = max(1, len(states))
+        settings.profile_export = args.profile_export
+
+    ai_game = AlienInvasion(headless=True, settings=settings)
+    start = perf_counter()
+    frames = ReplayDriver(ai_game, states).run()
+    elapsed = perf_counter() - start
+    ai_game.profiler.close()
+
+    print(f"{frames} frames in {elapsed:.2f} s "
+          f"({frames / elapsed if elapsed else 0:.0f} frames/s), "
+          f"score {ai_game.stats.score}, level {ai_game.stats.level}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import os
+import queue
+import stat
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+class ScoreStore:
+    """
+    A class to save high scores and score history off the game loop.
+
+    Writes are queued to a background thread. The high score file is
+    replaced atomically, so a crash mid-write never leaves it empty, and
+    every finished run is appended to a compact binary history log.
+    """
+    # One history record: finish time, final score, level reached.
+    record = struct.Struct("<dqI")
+
+    def __init__(self, high_score_path, history_path):
+        """
+        Initializes the store and starts its writer thread.
+
+        Either path may be None to skip saving that kind of data. With
+        neither, nothing is ever written and no thread is started.
+        """
+        self.high_score_path = high_score_path and Path(high_score_path)
+        self.history_path = history_path and Path(history_path)
+
+        self.jobs = queue.Queue()
+        self.writer = None
+        if self.high_score_path is not None or self.history_path is not None:
+            self.writer = threading.Thread(target=self._write_jobs,
+                                           daemon=True)
+            self.writer.start()
+
+
+    def load_high_score(self):
+        """
+        Returns the saved high score, or 0 if there is none yet.
+        """
+        if self.high_score_path is None:
+            return 0
+        try:
+            return int(self.high_score_path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+
+    def save_high_score(self, high_score):
+        """
+        Queues the high score to be written to disk.
+        """
+        if self.high_score_path is not None:
+            self.jobs.put((self._replace_high_score, high_score))
+
+
+    def record_run(self, score, level):
+        """
+        Queues a finished run to be appended to the history log.
+        """
+        if self.history_path is not None:
+            data = self.record.pack(time.time(), score, level)
+            self.jobs.put((self._append_history, data))
+
+
+    def history(self):
+        """
+        Yields (finish time, score, level) for every recorded run.
+
+        The log is only read when this is called, never at startup.
+        """
+        if self.history_path is None or not self.history_path.exists():
+            return
+        with open(self.history_path, "rb") as f:
+            data = f.read()
+
+        # Ignores a partial record left by an interrupted write.
+        end = len(data) - len(data) % self.record.size
+        yield from self.record.iter_unpack(data[:end])
+
+
+    def close(self):
+        """
+        Waits for every queued write to finish and stops the writer.
+        """
+        if self.writer is not None:
+            self.jobs.put(None)
+            self.writer.join()
+            self.writer = None
+
+
+    def _write_jobs(self):
+        """
+        Runs queued writes until close() is called.
+        """
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            function, argument = job
+            try:
+                function(argument)
+            except OSError:
+                # A failed save must never take the game down.
+                pass
+
+
+    def _replace_high_score(self, high_score):
+        """
+        Writes the high score to a temporary file, then renames it over
+        the real one.
+        """
+        directory = self.high_score_path.parent
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(str(high_score))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # mkstemp makes the file private to its owner; keeps the mode
+            # the high score file already had instead.
+            try:
+                mode = stat.S_IMODE(os.stat(self.high_score_path).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.high_score_path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+
+    def _append_history(self, data):
+        """
+        Appends one packed record to the history log.
+        """
+        with open(self.history_path, "ab") as f:
+            f.write(data)
@@ -1,6 +1,4 @@
-import pygame.font
-from pygame.sprite import Group
-from ship import Ship
+import pygame
 
 
 class Scoreboard:
@@ -19,15 +17,31 @@ class Scoreboard:
 
         # Font settings for scoring information.
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.text_cache = ai_game.text_cache
 
-        # Prepares the initial score image.
-        self.prep_score()
-        self.prep_high_score()
+        # The lives strip is drawn from the shared ship image, and only
+        # redrawn when the number of ships changes.
+        self.ship_image = ai_game.assets.load_image("images/ship.bmp")
+        self.ships_shown = None
 
-        # Sets the initial level and number of ships.
-        self.prep_level()
-        self.prep_ships()
+        # Prepares the initial images, then keeps them up to date as the
+        # statistics change.
+        self.stats.add_listener(self.stats_changed)
+        self.stats.flush()
+
+
+    def stats_changed(self, changed):
+        """
+        Re-renders the images of the statistics that changed.
+        """
+        if "score" in changed:
+            self.prep_score()
+        if "high_score" in changed:
+            self.prep_high_score()
+        if "level" in changed:
+            self.prep_level()
+        if "ships_left" in changed:
+            self.prep_ships()
 
 
     def prep_score(self):
@@ -36,10 +50,9 @@ class Scoreboard:
         """
         rounded_score = round(self.stats.score, -1)
         score_str = f"{rounded_score:,}"
-        self.score_image = self.font.render(score_str, 
-                                            True,
-                                            self.text_color,
-                                            self.settings.bg_color)
+        self.score_image = self.text_cache.render(score_str,
+                                                  self.text_color,
+                                                  self.settings.bg_color)
         
         # Displays the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -53,10 +66,9 @@ class Scoreboard:
         """
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(high_score_str,
-                                                 True,
-                                                 self.text_color,
-                                                 self.settings.bg_color)
+        self.high_score_image = self.text_cache.render(high_score_str,
+                                                       self.text_color,
+                                                       self.settings.bg_color)
         
         # Centers the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
@@ -69,10 +81,9 @@ class Scoreboard:
         Turns the level into a rendered image.
         """
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str,
-                                            True,
-                                            self.text_color,
-                                            self.settings.bg_color)
+        self.level_image = self.text_cache.render(level_str,
+                                                  self.text_color,
+                                                  self.settings.bg_color)
         
         # Positions the level below the score.
         self.level_rect = self.level_image.get_rect()
@@ -84,28 +95,35 @@ class Scoreboard:
         """
         Shows how many ships are left.
         """
-        self.ships = Group()
-        for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
+        ships_left = self.stats.ships_left
+        if ships_left == self.ships_shown:
+            return
+        self.ships_shown = ships_left
+
+        # Draws the ships side by side onto a single image.
+        ship_width, ship_height = self.ship_image.get_size()
+        self.ships_image = pygame.Surface((ship_width * ships_left,
+                                           ship_height)).convert()
+        self.ships_image.fill(self.settings.bg_color)
+        self.ships_image.blits([(self.ship_image, (n * ship_width, 0))
+                                for n in range(ships_left)], doreturn=False)
+        self.ships_rect = self.ships_image.get_rect(topleft=(10, 10))
 
 
     def show_score(self):
         """
         Draws scores, levels and ships to the screen.
         """
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        self.screen.blits(self.blit_items())
 
 
-    def check_high_score(self):
+    def blit_items(self):
         """
-        Check to see if there's a new high score.
+        Returns the scores, level and ships as (image, rect) pairs.
         """
-        if self.stats.score > self.stats.high_score:
-            self.stats.high_score = self.stats.score
-            self.prep_high_score()
\ No newline at end of file
+        items = [(self.score_image, self.score_rect),
+                 (self.high_score_image, self.high_score_rect),
+                 (self.level_image, self.level_rect)]
+        if self.ships_shown:
+            items.append((self.ships_image, self.ships_rect))
+        return items
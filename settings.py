@@ -13,6 +13,80 @@ class Settings:
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
 
+        # Logic steps per second. With a fixed timestep the game always
+        # advances in steps of 1 / logic_fps seconds, and interpolate_render
+        # draws between the last two steps. Without one, the game advances by
+        # each frame's measured time. Either way, a frame never counts for
+        # more than max_frame_time seconds.
+        self.logic_fps = 60
+        self.fixed_timestep = True
+        self.interpolate_render = False
+        self.max_frame_time = 0.25
+
+        # How close, as a fraction of a step, the time owed to the logic
+        # must be to a whole number of steps to run that many. This keeps
+        # frames paced near logic_fps at one step each; the difference is
+        # carried over, so game time still follows wall time.
+        self.timestep_snap = 0.125
+
+        # Frame pacing: the frames drawn per second (0 for no limit), how the
+        # wait between frames is done (see FramePacer), and pygame display
+        # flags such as "SCALED" or "DOUBLEBUF". report_pacing prints frame
+        # time jitter over the last pacing_history frames on exit.
+        self.target_fps = 60
+        self.pacing = "sleep"
+        self.display_flags = []
+        self.pacing_history = 600
+        self.report_pacing = False
+
+        # "dirty" sends only changed rects to the display; "flip" redraws
+        # the whole screen every frame. Past dirty_rect_limit changed rects,
+        # the dirty renderer flips the whole screen anyway.
+        self.render_mode = "dirty"
+        self.dirty_rect_limit = 200
+
+        # Frame profiling: times each phase over the last profile_frames
+        # frames, optionally shows them on screen, and writes them to
+        # profile_export (.csv or .json) on exit.
+        self.profile = False
+        self.profile_overlay = False
+        self.profile_frames = 600
+        self.profile_export = None
+
+        # Telemetry: where to log every frame and game event (see
+        # telemetry.py), or None. Records are written telemetry_buffer_records
+        # at a time, and the log moves on to a new part file once one passes
+        # telemetry_file_bytes.
+        self.telemetry_file = None
+        self.telemetry_buffer_records = 4096
+        self.telemetry_file_bytes = 64 * 1024 * 1024
+
+        # Frame export: the name of a shared memory block that every drawn
+        # frame is copied into (see frame_export.py), or None. Frames keep
+        # every frame_export_scale-th pixel, can be grayscale, and go round
+        # a ring of frame_export_slots frames.
+        self.frame_export = None
+        self.frame_export_scale = 1
+        self.frame_export_grayscale = False
+        self.frame_export_slots = 8
+
+        # A prebuilt bundle of the game's images (see assets.py), loaded at
+        # startup instead of decoding each image; None or a missing file
+        # decodes them as before. startup_profile prints how long each
+        # stage of startup took once the first frame is drawn.
+        self.asset_bundle = "images/assets.bundle"
+        self.startup_profile = False
+
+        # Seconds the game holds still after the ship is hit, and after the
+        # last ship is lost before returning to the menu.
+        self.hit_pause = 0.5
+        self.game_over_pause = 1.0
+
+        # Where the high score and the history of finished runs are saved.
+        # None skips saving.
+        self.high_score_file = "high_score.txt"
+        self.score_history_file = "score_history.bin"
+
         # Ship settings
         self.ship_limit = 3
 
@@ -22,8 +96,19 @@ class Settings:
         self.bullet_color = (60, 60, 60)
         self.bullets_allowed = 3
 
-        # Alien settings
+        # Alien settings. composite_fleet draws the fleet as one image that
+        # is only touched when an alien dies. mask_collisions checks that
+        # overlapping rects really share a drawn pixel before counting a hit.
         self.fleet_drop_speed = 10
+        self.composite_fleet = True
+        self.mask_collisions = True
+
+        # How many aliens of the next fleet are prepared per logic step
+        # while a level is played.
+        self.fleet_prewarm_batch = 64
+
+        # How many fleet layouts are kept worked out, most recent first.
+        self.fleet_template_cache = 8
 
         # Measures how quickly the game speeds up.
         self.speedup_scale = 1.1
@@ -31,6 +116,10 @@ class Settings:
         # Measures how quickly the alien point values increase.
         self.score_scale = 1.5
 
+        # Values that replace settings for good, including the ones reset
+        # at the start of every game (see batch.py).
+        self.overrides = {}
+
         self.initialize_dynamic_settings()
 
     
@@ -38,9 +127,10 @@ class Settings:
         """
         Initializes settings that change throughout the game.
         """
-        self.ship_speed = 1.5
-        self.bullet_speed = 2.5
-        self.alien_speed = 1.0
+        # Speeds are in pixels per second.
+        self.ship_speed = 90.0
+        self.bullet_speed = 150.0
+        self.alien_speed = 60.0
 
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
@@ -48,6 +138,9 @@ class Settings:
         # Scoring settings
         self.alien_points = 50
 
+        for name, value in self.overrides.items():
+            setattr(self, name, value)
+
 
     def increase_speed(self):
         """
@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 class Ship(Sprite):
@@ -16,28 +15,38 @@ class Ship(Sprite):
         self.screen_rect = ai_game.screen.get_rect()
 
         # Loads the ship image and gets its rect.
-        self.image = pygame.image.load("images/ship.bmp")
+        self.image = ai_game.assets.load_image("images/ship.bmp")
         self.rect = self.image.get_rect()
+        self.mask = ai_game.assets.load_mask("images/ship.bmp")
 
         # Starts each new ship at the bottom center of the screen.
         self.rect.midbottom = self.screen_rect.midbottom
 
-        # Stores a float for the ship's exact horizontal position.
+        # Stores a float for the ship's exact horizontal position, along
+        # with where it was before the last logic step.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
         # The movement flag: starts with a ship that's not moving.
         self.moving_right = False
         self.moving_left = False
 
     
-    def update(self):
+    def save_position(self):
         """
-        Updates the ship's position (x-value) based on the movement flag.
+        Remembers the current position before a logic step.
+        """
+        self.prev_x = self.x
+
+
+    def update(self, dt):
+        """
+        Moves the ship for dt seconds based on the movement flag.
         """
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # Updates the rect object from self.x.
         self.rect.x = self.x
@@ -49,10 +58,12 @@ class Ship(Sprite):
         """
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
 
-    def blitme(self):
+    def draw_rect(self, alpha):
         """
-        Draws the ship at its current location.
+        Returns the rect to draw the ship at, alpha of the way between its
+        last two positions.
         """
-        self.screen.blit(self.image, self.rect)
\ No newline at end of file
+        return self.rect.move(round((self.prev_x - self.x) * (1 - alpha)), 0)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from time import perf_counter
+
+
+class StartupTimer:
+    """
+    A class to time each stage of the game's startup.
+    """
+    def __init__(self, start=None):
+        """
+        Starts timing from start, a perf_counter() reading, or from now.
+        """
+        self.start = perf_counter() if start is None else start
+        self.last = self.start
+        self.stages = []
+
+
+    def mark(self, stage):
+        """
+        Ends stage, timing it from the end of the stage before.
+        """
+        now = perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+    def report(self):
+        """
+        Returns a table of the stages and the total, in milliseconds.
+        """
+        width = max([len(stage) for stage, _ in self.stages] + [5])
+        lines = [f"{stage:<{width}} {seconds * 1000:8.1f} ms"
+                 for stage, seconds in self.stages]
+        lines.append(f"{'total':<{width}} "
+                     f"{(self.last - self.start) * 1000:8.1f} ms")
+        return "\n".join(lines)
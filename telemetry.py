@@ -0,0 +1,257 @@
+"""
+Logs what happens during a game as compact binary records.
+
+Every drawn frame and every shot, kill, ship hit and level-up becomes one
+fixed-size record, packed into a preallocated buffer. Full buffers are
+written out by a background thread, to files that roll over to a new part
+once they pass a size limit. Running this file summarizes a log:
+
+    python alien_invasion.py --telemetry logs/session.bin
+    python telemetry.py logs/session.bin
+"""
+import argparse
+import glob
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from enum import IntEnum
+
+from percentiles import percentile
+
+
+class Event(IntEnum):
+    """
+    The kinds of telemetry record.
+    """
+    # value is the frame time in seconds.
+    FRAME = 0
+    # count is the number of bullets in flight, including the new one.
+    SHOT = 1
+    # count is the number of aliens one bullet destroyed; value the points.
+    KILL = 2
+    # count is the number of spare ships before the hit; 0 ends the game.
+    SHIP_HIT = 3
+    # count is the level reached.
+    LEVEL_UP = 4
+
+
+# A file starts with a magic string, a version, the record size and the
+# time the session started. Then come records of logic step, event, count
+# and value.
+MAGIC = b"AITL"
+VERSION = 1
+HEADER = struct.Struct("<4sBBd")
+RECORD = struct.Struct("<IBif")
+
+Record = namedtuple("Record", "step event count value")
+
+
+class NullTelemetry:
+    """
+    A class with the telemetry interface that records nothing.
+    """
+    enabled = False
+
+    def emit(self, event, count=0, value=0.0):
+        pass
+
+    def close(self):
+        pass
+
+
+class Telemetry:
+    """
+    A class to buffer telemetry records and write them off the game loop.
+
+    Records are packed straight into a preallocated buffer. A full buffer
+    is queued to the writer thread and replaced by one the writer has
+    finished with, so the game never waits on the disk.
+    """
+    enabled = True
+
+    def __init__(self, ai_game):
+        """
+        Initializes the first buffer and starts the writer thread.
+        """
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.path = self.settings.telemetry_file
+        self.started = time.time()
+
+        self.size = self.settings.telemetry_buffer_records * RECORD.size
+        self.buffer = bytearray(self.size)
+        self.offset = 0
+        self.spare_buffers = queue.SimpleQueue()
+        self.full_buffers = queue.SimpleQueue()
+
+        self.part = 0
+        self.file = None
+        self.writer = threading.Thread(target=self._write_buffers, daemon=True)
+        self.writer.start()
+
+
+    def emit(self, event, count=0, value=0.0):
+        """
+        Adds a record of event during the current logic step.
+        """
+        RECORD.pack_into(self.buffer, self.offset, self.ai_game.frame_count,
+                         event, count, value)
+        self.offset += RECORD.size
+        if self.offset == self.size:
+            self._hand_off()
+
+
+    def _hand_off(self):
+        """
+        Queues the current buffer for writing and starts on a spare one.
+        """
+        self.full_buffers.put((self.buffer, self.offset))
+        try:
+            self.buffer = self.spare_buffers.get_nowait()
+        except queue.Empty:
+            # The writer is behind, so the game makes another buffer
+            # rather than wait for it.
+            self.buffer = bytearray(self.size)
+        self.offset = 0
+
+
+    def close(self):
+        """
+        Writes out the records still buffered and stops the writer.
+        """
+        if self.offset:
+            self._hand_off()
+        self.full_buffers.put(None)
+        self.writer.join()
+
+
+    def _write_buffers(self):
+        """
+        Writes each full buffer to the current part, until told to stop.
+        """
+        # Parts left by an earlier session at the same path would
+        # otherwise be read as part of this one.
+        for path in log_parts(self.path):
+            os.remove(path)
+
+        while True:
+            job = self.full_buffers.get()
+            if job is None:
+                break
+            buffer, length = job
+            if (self.file is None or self.file.tell() + length
+                    > self.settings.telemetry_file_bytes):
+                self._next_part()
+            self.file.write(memoryview(buffer)[:length])
+            self.spare_buffers.put(buffer)
+
+        if self.file is not None:
+            self.file.close()
+
+
+    def _next_part(self):
+        """
+        Closes the current part and opens the next one.
+        """
+        if self.file is not None:
+            self.file.close()
+        self.part += 1
+        path = part_path(self.path, self.part)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.started))
+
+
+def part_path(path, part):
+    """
+    Returns the path of the given part of the log at path.
+    """
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{part:04d}{extension}"
+
+
+def log_parts(path):
+    """
+    Returns the paths of every part of the log at path, in order.
+    """
+    stem, extension = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(stem)}.[0-9][0-9][0-9][0-9]"
+                            f"{glob.escape(extension)}"))
+
+
+def read_records(path, chunk_records=4096):
+    """
+    Yields every record of the log at path as a Record, reading each part
+    a chunk at a time.
+
+    Parts from a session other than the first part's are left out.
+    """
+    session = None
+    for part in log_parts(path):
+        with open(part, "rb") as f:
+            magic, version, record_size, started = HEADER.unpack(
+                f.read(HEADER.size))
+            if (magic != MAGIC or version != VERSION
+                    or record_size != RECORD.size):
+                raise ValueError(f"{part} is not a telemetry log")
+            if session is None:
+                session = started
+            elif started != session:
+                return
+
+            while True:
+                chunk = f.read(chunk_records * RECORD.size)
+                if not chunk:
+                    break
+                whole = len(chunk) - len(chunk) % RECORD.size
+                for step, event, count, value in \
+                        RECORD.iter_unpack(chunk[:whole]):
+                    yield Record(step, Event(event), count, value)
+
+
+def summarize(records):
+    """
+    Returns event counts and frame time statistics for records.
+    """
+    events = Counter()
+    frame_times = []
+    kills = points = 0
+    for record in records:
+        events[record.event.name] += 1
+        if record.event is Event.FRAME:
+            frame_times.append(record.value * 1000)
+        elif record.event is Event.KILL:
+            kills += record.count
+            points += record.value
+
+    summary = {"events": dict(events), "aliens_killed": kills,
+               "points": points}
+    if frame_times:
+        frame_times.sort()
+        summary["frame_ms"] = {
+            "mean": sum(frame_times) / len(frame_times),
+            "p50": percentile(frame_times, 50),
+            "p99": percentile(frame_times, 99),
+            "max": frame_times[-1]}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="the --telemetry path given to the game")
+    args = parser.parse_args(argv)
+
+    if not log_parts(args.path):
+        print(f"No telemetry found for {args.path}")
+        return 1
+    print(json.dumps(summarize(read_records(args.path)), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class GlyphAtlas:
+    """
+    A class to hold pre-rendered glyphs for one font and color.
+    """
+    def __init__(self, font, color, background, chars):
+        """
+        Renders every character in chars once.
+        """
+        self.font = font
+        self.color = color
+        self.background = background
+        self.glyphs = {char: font.render(char, True, color, background)
+                       for char in chars}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+
+    def can_compose(self, text):
+        """
+        Returns True if every character of text has a glyph.
+        """
+        return all(char in self.glyphs for char in text)
+
+
+    def compose(self, text):
+        """
+        Builds an image of text by blitting the cached glyphs side by side.
+        """
+        glyphs = [self.glyphs[char] for char in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+
+        if self.background is None:
+            image = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        else:
+            image = pygame.Surface((width, self.height))
+            image.fill(self.background)
+
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return image
+
+
+class TextCache:
+    """
+    A class to render text with one font, reusing earlier results.
+
+    Numbers are built from a digit and comma atlas, so a new score never
+    goes through the font rasterizer. Other text is rendered by the font
+    once and kept. Both are kept in a small cache of recent strings.
+    """
+    atlas_chars = "0123456789,"
+
+    def __init__(self, font, max_entries=64):
+        """
+        Initializes an empty cache for font.
+        """
+        self.font = font
+        self.max_entries = max_entries
+        self.atlases = {}
+        self.recent = OrderedDict()
+
+
+    def render(self, text, color, background=None):
+        """
+        Returns an image of text, like font.render() with antialiasing on.
+        """
+        key = (text, color, background)
+        image = self.recent.get(key)
+        if image is not None:
+            self.recent.move_to_end(key)
+            return image
+
+        atlas = self._atlas(color, background)
+        if text and atlas.can_compose(text):
+            image = atlas.compose(text)
+        else:
+            image = self.font.render(text, True, color, background)
+
+        self.recent[key] = image
+        if len(self.recent) > self.max_entries:
+            self.recent.popitem(last=False)
+        return image
+
+
+    def _atlas(self, color, background):
+        """
+        Returns the glyph atlas for color and background, building it once.
+        """
+        atlas = self.atlases.get((color, background))
+        if atlas is None:
+            atlas = GlyphAtlas(self.font, color, background, self.atlas_chars)
+            self.atlases[(color, background)] = atlas
+        return atlas